@@ -18,9 +18,9 @@ def main():
     arguments = " ".join(args) if args else ""
 
     try:
-        # Execute the compose_input.py script with the arguments
+        # Execute the compose_client.py script with the arguments
         result = subprocess.run(
-            [sys.executable, "claude_intelligence/solution_map_implementation/compose_input.py", arguments],
+            [sys.executable, "claude_intelligence/solution_map_implementation/compose_client.py", arguments],
             capture_output=True,
             text=True,
             timeout=30,
@@ -28,7 +28,7 @@ def main():
         )
 
         if result.returncode != 0:
-            print(f"Error executing compose_input.py: {result.stderr.strip()}")
+            print(f"Error executing compose_client.py: {result.stderr.strip()}")
             return
 
         # Output the result from the script
@@ -36,14 +36,14 @@ def main():
         if output:
             print(output)
         else:
-            print("compose_input.py completed but produced no output")
+            print("compose_client.py completed but produced no output")
 
     except subprocess.TimeoutExpired:
-        print("compose_input.py execution timed out")
+        print("compose_client.py execution timed out")
     except FileNotFoundError:
-        print("compose_input.py script not found at claude_intelligence/solution_map_implementation/compose_input.py")
+        print("compose_client.py script not found at claude_intelligence/solution_map_implementation/compose_client.py")
     except Exception as e:
-        print(f"Error running compose_input.py: {str(e)}")
+        print(f"Error running compose_client.py: {str(e)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
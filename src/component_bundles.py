@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Component Bundles - Compiled per-step input components
+Pre-builds one bundle per (step, phase) key of input_component_files so a
+component load is a single read. Bundles rebuild automatically when any
+source file's mtime/size changes and its content hash no longer matches -
+for the preference store, only when the key's own step's preferences changed
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+from preference_store import store_path, load_store, step_preferences, render_step_info
+from section_retrieval import INDEX_KEY, build_section_index
+
+BUNDLE_VERSION = 4
+
+
+def bundle_path(state_manager, key):
+    """Location of the compiled bundle for a (step, phase) key"""
+    step, phase = key
+    return state_manager.cache_dir / "bundles" / f"{step}_phase{phase}.json"
+
+
+def bundle_sources(state_manager, key):
+    """Ordered (component_type, path) pairs that make up a key's components"""
+    # Common framework info first - a key's own framework_info overrides it
+    sources = [("framework_info", state_manager.framework_info_file)]
+    for component_type, filename in state_manager.input_component_files[key].items():
+        sources.append((component_type, state_manager.components_dir / filename))
+    # Structured USER PREFERENCES are rendered into step_info at compile time
+    if "step_info" in state_manager.input_component_files[key]:
+        sources.append(("user_preferences", store_path(state_manager.components_dir)))
+    return sources
+
+
+def _content_hash(content):
+    """SHA-256 of a source file's text"""
+    import hashlib
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _preferences_hash(preferences):
+    """SHA-256 of one step's slice of the preference store"""
+    return _content_hash(json.dumps(preferences))
+
+
+def _file_record(path, content=None):
+    """Stat/hash record used to detect source changes"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return {"path": str(path), "missing": True}
+    record = {"path": str(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    if content is not None:
+        record["sha256"] = _content_hash(content)
+    return record
+
+
+def compile_bundle(state_manager, key):
+    """Read a key's source files and write its pre-joined bundle"""
+    components = {}
+    records = []
+    step_info_file = state_manager.input_component_files[key].get("step_info")
+    for component_type, path in bundle_sources(state_manager, key):
+        if component_type == "user_preferences":
+            # Fingerprint only this step's preferences - other steps' updates keep the bundle
+            preferences = step_preferences(load_store(state_manager.components_dir), step_info_file)
+            records.append(dict(_file_record(path), step_info=step_info_file,
+                                sha256=_preferences_hash(preferences)))
+            continue
+        if path.exists():
+            with open(path, 'r') as f:
+                raw = f.read()
+            components[component_type] = raw.strip()
+            records.append(_file_record(path, raw))
+        else:
+            if path == state_manager.framework_info_file:
+                components[component_type] = "❌ Missing framework_info.md"
+            else:
+                components[component_type] = f"❌ Missing file: {state_manager.input_component_files[key][component_type]}"
+            records.append(_file_record(path))
+
+    if step_info_file and "step_info" in components:
+        components["step_info"] = render_step_info(components["step_info"], preferences).strip()
+
+    # Section index for question-aware retrieval, rebuilt with the bundle
+    components[INDEX_KEY] = build_section_index(components)
+
+    _write_bundle(bundle_path(state_manager, key), {
+        "version": BUNDLE_VERSION,
+        "key": list(key),
+        "sources": records,
+        "components": components,
+    })
+    return components
+
+
+def _write_bundle(path, bundle):
+    """Atomically replace a bundle file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(bundle, f)
+    os.replace(tmp_path, path)
+
+
+def _sources_current(records):
+    """
+    Check recorded sources against disk
+    Returns (is_current, records_changed) - records_changed means only
+    mtimes moved while content hashes still match
+    """
+    records_changed = False
+    for record in records:
+        path = record["path"]
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if record.get("missing"):
+                continue
+            return False, False
+        if record.get("missing"):
+            return False, False
+        if st.st_mtime_ns == record["mtime_ns"] and st.st_size == record["size"]:
+            continue
+        if "step_info" in record:
+            # Preference store - only a change to this step's slice forces a rebuild
+            preferences = step_preferences(load_store(Path(path).parent), record["step_info"])
+            if _preferences_hash(preferences) != record["sha256"]:
+                return False, False
+        else:
+            if st.st_size != record["size"]:
+                return False, False
+            # Same size, new mtime - only a content change forces a rebuild
+            with open(path, 'r') as f:
+                raw = f.read()
+            if _content_hash(raw) != record.get("sha256"):
+                return False, False
+        record["mtime_ns"], record["size"] = st.st_mtime_ns, st.st_size
+        records_changed = True
+    return True, records_changed
+
+
+def load_bundle(state_manager, key):
+    """Load a key's components with one read, rebuilding the bundle if stale"""
+    return _load_or_compile(state_manager, key)[0]
+
+
+def _load_or_compile(state_manager, key):
+    """(components, rebuilt) for a key - the bundle is compiled only when stale"""
+    path = bundle_path(state_manager, key)
+    try:
+        with open(path, 'r') as f:
+            bundle = json.load(f)
+    except (OSError, ValueError):
+        return compile_bundle(state_manager, key), True
+
+    if bundle.get("version") != BUNDLE_VERSION or tuple(bundle.get("key", ())) != key:
+        return compile_bundle(state_manager, key), True
+
+    is_current, records_changed = _sources_current(bundle["sources"])
+    if not is_current:
+        return compile_bundle(state_manager, key), True
+    if records_changed:
+        _write_bundle(path, bundle)
+    return bundle["components"], False
+
+
+def compile_all(state_manager):
+    """Compile bundles for every (step, phase) key"""
+    for key in state_manager.input_component_files:
+        compile_bundle(state_manager, key)
+    return list(state_manager.input_component_files)
+
+
+def recompile_for_file(state_manager, file_path):
+    """
+    Rebuild every bundle that includes file_path - after a preference store
+    update only the bundles whose step's preferences changed
+    """
+    file_path = Path(file_path).resolve()
+    is_store = file_path == store_path(state_manager.components_dir).resolve()
+    rebuilt = []
+    for key in state_manager.input_component_files:
+        if not any(path.resolve() == file_path for _, path in bundle_sources(state_manager, key)):
+            continue
+        if is_store:
+            if _load_or_compile(state_manager, key)[1]:
+                rebuilt.append(key)
+        else:
+            compile_bundle(state_manager, key)
+            rebuilt.append(key)
+    return rebuilt
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("compile", "status"):
+        print("Usage: python component_bundles.py [compile|status]")
+        return
+
+    from framework_state import FrameworkState
+    state_manager = FrameworkState()
+
+    if sys.argv[1] == "compile":
+        for step, phase in compile_all(state_manager):
+            print(f"📦 Compiled bundle: {bundle_path(state_manager, (step, phase))}")
+    else:
+        for key in state_manager.input_component_files:
+            path = bundle_path(state_manager, key)
+            if not path.exists():
+                status = "missing"
+            else:
+                with open(path, 'r') as f:
+                    is_current, _ = _sources_current(json.load(f).get("sources", []))
+                status = "current" if is_current else "stale"
+            print(f"{'✅' if status == 'current' else '⚠️ '} Step {key[0]}, Phase {key[1]}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compose Client - Thin hook entry point for the compose daemon
+Forwards the user question to compose_daemon.py and falls back to the
+in-process compose_input.py path when no daemon is running
+"""
+
+import os
+import sys
+import json
+import socket
+from pathlib import Path
+from hook_profiler import PROFILE_FLAG
+
+SOCKET_PATH = Path(__file__).parent / ".cache" / "compose_daemon.sock"
+
+
+def request_from_daemon(user_question, timeout=30.0):
+    """Return the daemon response, or None when the daemon can't serve it"""
+    if not SOCKET_PATH.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(SOCKET_PATH))
+            request = {"command": "compose", "question": user_question,
+                       "cwd": os.getcwd(), "session": os.environ.get("SIXSTEP_SESSION")}
+            sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        response = json.loads(data.decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+    return response if response.get("status") == "ok" else None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python compose_client.py [--profile] 'user question'")
+        return
+
+    if PROFILE_FLAG in sys.argv:
+        # Profiling times the in-process stages - compose here instead of in the daemon
+        import compose_input
+        compose_input.main()
+        return
+
+    response = request_from_daemon(" ".join(sys.argv[1:]))
+    if response is None:
+        # No daemon (or stale daemon) - run today's in-process path
+        import compose_input
+        compose_input.main()
+        return
+
+    if response.get("stderr"):
+        sys.stderr.write(response["stderr"])
+    print(response["output"])
+
+
+if __name__ == "__main__":
+    main()
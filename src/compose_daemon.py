@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Compose Daemon - Resident pre-process program
+Keeps FrameworkState, input components and session state in memory and
+serves compose requests from compose_client.py over a Unix socket
+"""
+
+import os
+import sys
+import json
+import socket
+import socketserver
+import subprocess
+from io import StringIO
+from contextlib import redirect_stdout, redirect_stderr
+from pathlib import Path
+from framework_state import FrameworkState
+from component_bundles import bundle_sources
+from session_registry import registry_path, empty_registry
+from session_context import SessionContext
+import compose_input
+import meta_spool
+
+SCRIPT_DIR = Path(__file__).parent
+SOCKET_PATH = SCRIPT_DIR / ".cache" / "compose_daemon.sock"
+
+# Framework modules live next to this file - a loaded one changing on disk means stale code
+SCRIPT_DIR_RESOLVED = SCRIPT_DIR.resolve()
+
+
+class ResidentFrameworkState(FrameworkState):
+    """FrameworkState that keeps state and component files in memory until they change on disk"""
+
+    def __init__(self):
+        self._file_cache = {}
+        super().__init__(fast_path=True)
+
+    def _cached_read(self, file_path, loader):
+        """Return cached file contents while (inode, mtime, size) are unchanged"""
+        st = os.stat(file_path)
+        # Atomic saves replace the file, so the inode changes even within one mtime tick
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._file_cache.get(file_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        value = loader(file_path)
+        self._file_cache[file_path] = (signature, value)
+        return value
+
+    def _load_registry(self):
+        """Session registry, served from memory when unchanged"""
+        try:
+            return self._cached_read(registry_path(self.sessions_dir), lambda _: FrameworkState._load_registry(self))
+        except FileNotFoundError:
+            return empty_registry()
+
+    def load_current_state(self):
+        """Load current framework state, served from memory when unchanged"""
+        if self.legacy_ignored:
+            return None
+        try:
+            state = self._cached_read(self.state_file, lambda _: FrameworkState.load_current_state(self))
+        except FileNotFoundError:
+            self._file_cache.pop(self.state_file, None)
+            return None
+        # Hand out a copy so callers can mutate it freely
+        return dict(state) if state else None
+
+    def load_components(self, key):
+        """Load a key's components, served from memory while no source file changed"""
+        signature = []
+        for _, path in bundle_sources(self, key):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        cached = self._file_cache.get(key)
+        if cached and cached[0] == signature:
+            return dict(cached[1])
+        components = super().load_components(key)
+        self._file_cache[key] = (signature, components)
+        return dict(components)
+
+
+def loaded_sources():
+    """Files of the framework modules imported into this process (lazy imports included)"""
+    sources = set()
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path and Path(path).resolve().parent == SCRIPT_DIR_RESOLVED:
+            sources.add(str(Path(path).resolve()))
+    return sources
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def source_signature():
+    """{path: mtime} of the framework modules loaded so far"""
+    return {path: _mtime(path) for path in loaded_sources()}
+
+
+def sources_changed(signature):
+    """
+    True when a loaded framework module changed on disk since it was recorded
+    in signature - modules imported since (lazily) are recorded now
+    """
+    for path in loaded_sources():
+        if path not in signature:
+            signature[path] = _mtime(path)
+        elif _mtime(path) != signature[path]:
+            return True
+    return False
+
+
+class ComposeRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one JSON request line and answer with one JSON response line"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._reply({"status": "error", "error": "Malformed request"})
+            return
+
+        command = request.get("command", "compose")
+        if command == "ping":
+            self._reply({"status": "ok", "pid": os.getpid()})
+        elif command == "shutdown":
+            self._reply({"status": "ok"})
+            self.server.shutdown_requested = True
+        elif sources_changed(self.server.source_signature):
+            # Code changed since start - let the client fall back and exit
+            self._reply({"status": "stale"})
+            self.server.shutdown_requested = True
+        elif command == "compose":
+            # Resolve the caller's session (its SIXSTEP_SESSION, else its working directory) -
+            # never the daemon's own environment, which belongs to whichever shell started it
+            self.server.state_manager.select_session(request.get("session"), request.get("cwd"), use_env=False)
+            self._reply(self._compose(request.get("question", "")))
+            # The reply is out - now append the spooled meta log entry
+            try:
+                meta_spool.drain(self.server.state_manager.cache_dir)
+            except OSError as e:
+                print(f"⚠️  Meta spool drain failed: {e}", file=sys.stderr)
+        else:
+            self._reply({"status": "error", "error": f"Unknown command: {command}"})
+
+    def _compose(self, user_question):
+        """Run the in-process compose path against the resident state"""
+        stdout, stderr = StringIO(), StringIO()
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                session = SessionContext(self.server.state_manager)
+                output = compose_input.build_hook_output(user_question, session)
+        except Exception as e:
+            return {"status": "error", "error": f"Compose failed: {e}"}
+        return {"status": "ok", "output": stdout.getvalue() + output, "stderr": stderr.getvalue()}
+
+    def _reply(self, response):
+        self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+
+
+class ComposeDaemon(socketserver.UnixStreamServer):
+    """Single-threaded server so interaction logging stays strictly ordered"""
+
+    def __init__(self, socket_path):
+        self.state_manager = ResidentFrameworkState()
+        self.source_signature = source_signature()
+        self.shutdown_requested = False
+        super().__init__(str(socket_path), ComposeRequestHandler)
+
+
+def send_request(request, timeout=2.0):
+    """Send one request to a running daemon and return its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(SOCKET_PATH))
+        sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.decode('utf-8'))
+
+
+def is_running():
+    """Check whether a daemon answers on the socket"""
+    try:
+        return send_request({"command": "ping"}, timeout=0.5).get("status") == "ok"
+    except (OSError, ValueError):
+        return False
+
+
+def serve():
+    """Run the daemon in the foreground until shut down"""
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+    if SOCKET_PATH.exists():
+        if is_running():
+            print(f"❌ Compose daemon already running on {SOCKET_PATH}")
+            return
+        SOCKET_PATH.unlink()
+
+    server = ComposeDaemon(SOCKET_PATH)
+    try:
+        while not server.shutdown_requested:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if SOCKET_PATH.exists():
+            SOCKET_PATH.unlink()
+
+
+def start():
+    """Start the daemon detached from the current terminal"""
+    if is_running():
+        print(f"✅ Compose daemon already running on {SOCKET_PATH}")
+        return
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "serve"],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    print(f"🚀 Started compose daemon on {SOCKET_PATH}")
+
+
+def stop():
+    """Ask a running daemon to shut down"""
+    try:
+        send_request({"command": "shutdown"})
+        print("🛑 Compose daemon stopped")
+    except (OSError, ValueError):
+        print("❌ Compose daemon is not running")
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("start", "stop", "status", "serve"):
+        print("Usage: python compose_daemon.py [start|stop|status|serve]")
+        return
+
+    command = sys.argv[1]
+    if command == "serve":
+        serve()
+    elif command == "start":
+        start()
+    elif command == "stop":
+        stop()
+    elif command == "status":
+        if is_running():
+            print(f"✅ Compose daemon running on {SOCKET_PATH}")
+        else:
+            print("❌ Compose daemon is not running")
+
+
+if __name__ == "__main__":
+    main()
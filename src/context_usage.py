@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Context Usage Provider - Non-blocking session context probe
+Serves `claude context` results from a short-lived on-disk cache and
+refreshes it in a detached background process, so prompt emission never
+waits on the Claude CLI
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+CACHE_TTL_SECONDS = 30          # A cached probe is "fresh" for this long
+LATENCY_BUDGET_SECONDS = 0.05   # Max time a caller waits when nothing is cached yet
+PROBE_TIMEOUT_SECONDS = 10      # Timeout for the background `claude context` call
+REFRESH_LOCK_STALE_SECONDS = PROBE_TIMEOUT_SECONDS + 5
+
+
+def probe_context_usage():
+    """Get real Claude session context usage via /context command (blocking)"""
+    import re
+    import subprocess
+    try:
+        # Run /context command to get current session context
+        result = subprocess.run(['claude', 'context'],
+                               capture_output=True, text=True, timeout=PROBE_TIMEOUT_SECONDS)
+
+        if result.returncode != 0:
+            return None, "Failed to get context info"
+
+        # Parse the context output to extract usage percentage
+        output = result.stdout
+
+        # Check if this is actually context output or a normal Claude response
+        if "Context Usage" not in output and "tokens" not in output:
+            return None, "Command returned normal Claude response, not context info"
+
+        # Look for patterns like "126k/200k tokens (63%)" or similar
+        token_match = re.search(r'(\d+\.?\d*)k?/(\d+)k?\s+tokens\s*\((\d+\.?\d*)%\)', output)
+        if token_match:
+            used_tokens = float(token_match.group(1)) * (1000 if 'k' in token_match.group(1) else 1)
+            total_tokens = float(token_match.group(2)) * 1000  # Always in k
+            percentage = float(token_match.group(3))
+
+            return {
+                'percentage': percentage,
+                'used_tokens': int(used_tokens),
+                'total_tokens': int(total_tokens),
+                'raw_output': output.strip()
+            }, None
+
+        # Alternative pattern matching for different formats
+        percent_match = re.search(r'(\d+\.?\d*)%', output)
+        if percent_match:
+            percentage = float(percent_match.group(1))
+            return {
+                'percentage': percentage,
+                'used_tokens': None,
+                'total_tokens': None,
+                'raw_output': output.strip()
+            }, None
+
+        return None, f"Could not parse context output: {output[:100]}"
+
+    except subprocess.TimeoutExpired:
+        return None, "Context command timed out"
+    except FileNotFoundError:
+        return None, "Claude CLI not found - using fallback estimation"
+    except Exception as e:
+        return None, f"Error getting context: {e}"
+
+
+def _cache_file(cache_dir):
+    return Path(cache_dir) / "context_usage.json"
+
+
+def _lock_file(cache_dir):
+    return Path(cache_dir) / "context_usage.refresh.lock"
+
+
+def read_cached_usage(cache_dir=CACHE_DIR):
+    """Return the cached probe entry ({timestamp, info, error}) or None"""
+    try:
+        with open(_cache_file(cache_dir), 'r') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if isinstance(entry, dict) and "timestamp" in entry else None
+
+
+def write_cached_usage(info, error, cache_dir=CACHE_DIR):
+    """Atomically replace the cached probe entry"""
+    cache_file = _cache_file(cache_dir)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w') as f:
+        json.dump({"timestamp": time.time(), "info": info, "error": error}, f)
+    os.replace(tmp_file, cache_file)
+
+
+def trigger_refresh(cache_dir=CACHE_DIR):
+    """Start a detached background probe unless one is already running"""
+    lock_file = _lock_file(cache_dir)
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        # A refresher is running - unless it died and left its lock behind
+        try:
+            if time.time() - lock_file.stat().st_mtime < REFRESH_LOCK_STALE_SECONDS:
+                return False
+            lock_file.unlink()
+            fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except OSError:
+            return False
+    os.close(fd)
+
+    import subprocess
+    try:
+        subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "refresh", str(cache_dir)],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+    except OSError:
+        lock_file.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def refresh(cache_dir=CACHE_DIR):
+    """Run the blocking probe and store its result (background process body)"""
+    try:
+        info, error = probe_context_usage()
+        write_cached_usage(info, error, cache_dir)
+    finally:
+        _lock_file(cache_dir).unlink(missing_ok=True)
+
+
+def get_context_usage(cache_dir=CACHE_DIR, ttl=CACHE_TTL_SECONDS, latency_budget=LATENCY_BUDGET_SECONDS):
+    """
+    Return (context_info, error) within the latency budget
+    Fresh cache hits return immediately; stale or missing entries trigger a
+    background refresh and return the last known value (or None) right away
+    """
+    entry = read_cached_usage(cache_dir)
+    if entry and time.time() - entry["timestamp"] <= ttl:
+        return _entry_result(entry)
+
+    trigger_refresh(cache_dir)
+
+    if entry is None and latency_budget > 0:
+        # Nothing known yet - give a fast probe a brief chance to land
+        deadline = time.monotonic() + latency_budget
+        while entry is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+            entry = read_cached_usage(cache_dir)
+
+    if entry is None:
+        return None, "Context usage not cached yet - refreshing in background"
+    return _entry_result(entry)
+
+
+def _entry_result(entry):
+    """Convert a cache entry to the (context_info, error) shape callers expect"""
+    info = entry.get("info")
+    if not info:
+        return None, entry.get("error") or "Context usage unavailable"
+    info = dict(info)
+    info['age_seconds'] = max(0.0, time.time() - entry["timestamp"])
+    return info, None
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "refresh":
+        refresh(Path(sys.argv[2]) if len(sys.argv) > 2 else CACHE_DIR)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "show":
+        info, error = get_context_usage(latency_budget=0)
+        print(json.dumps(info, indent=2) if info else f"❌ {error}")
+    else:
+        print("Usage: python context_usage.py [refresh|show]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Delta Prompts - Send each component body once per step
+With SIXSTEP_DELTA_PROMPTS=1, compose_input.py remembers per session which
+component hashes it already emitted in the current step/phase and replaces
+repeats with a short "unchanged" reference. Everything is sent again after
+a step/phase change, a step_info change (preference updates are rendered
+into it), a detected context compaction (the real context usage dropping
+sharply) or `python delta_prompts.py reset`, which the shipped settings run
+as a PreCompact hook - the probe alone can be up to 30 seconds stale
+"""
+
+import os
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+DELTA_ENV = "SIXSTEP_DELTA_PROMPTS"
+DELTA_DIR = "delta"
+RECORD_VERSION = 1
+DELTA_COMPONENTS = ("framework_info", "step_info", "data_sources", "output_requirements")
+# A real context usage below half the last one, and at least this many points lower, means compaction
+COMPACTION_DROP = 10.0
+
+UNCHANGED_REFERENCE = "(unchanged - identical to the {label} sent earlier in this step, ref {digest})"
+LABELS = {
+    "framework_info": "FRAMEWORK INFO",
+    "step_info": "CURRENT STEP/PHASE instructions",
+    "data_sources": "DATA SOURCES",
+    "output_requirements": "OUTPUT REQUIREMENTS",
+}
+
+
+def delta_enabled():
+    return os.environ.get(DELTA_ENV, "") not in ("", "0")
+
+
+def record_path(cache_dir, session_key):
+    return Path(cache_dir) / DELTA_DIR / f"{session_key}.json"
+
+
+def load_record(path):
+    """{"version", "step", "phase", "emitted": {component: [hashes]}, "context_percent"} or None"""
+    try:
+        with open(path, 'r') as f:
+            record = json.load(f)
+        if record.get("version") == RECORD_VERSION:
+            return record
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def save_record(path, record):
+    """Atomically replace a session's delta record"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+
+
+def component_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def compacted(previous_percent, percent):
+    """True when the real context usage fell sharply since the last prompt"""
+    if previous_percent is None or percent is None:
+        return False
+    return percent < previous_percent / 2 and previous_percent - percent >= COMPACTION_DROP
+
+
+def reset_reason(record, step, phase, step_info_hash, context_percent):
+    """Why every component must be sent again (None when earlier emissions still count)"""
+    if record is None:
+        return "first prompt"
+    if (record["step"], record["phase"]) != (step, phase):
+        return "step change"
+    if step_info_hash not in record["emitted"].get("step_info", []):
+        return "step_info changed"
+    if compacted(record.get("context_percent"), context_percent):
+        return "context compaction"
+    return None
+
+
+def apply_delta(components, record, step, phase, context_percent=None):
+    """
+    (components, new_record, reused) - bodies already emitted in this step
+    are replaced with an unchanged reference; reused lists those components
+    """
+    hashes = {name: component_hash(components[name]) for name in DELTA_COMPONENTS if components.get(name)}
+    if reset_reason(record, step, phase, hashes.get("step_info"), context_percent):
+        record = {"version": RECORD_VERSION, "step": step, "phase": phase, "emitted": {}}
+    emitted = {name: list(seen) for name, seen in record["emitted"].items()}
+
+    result, reused = dict(components), []
+    for name, digest in hashes.items():
+        if digest in emitted.get(name, []):
+            result[name] = UNCHANGED_REFERENCE.format(label=LABELS[name], digest=digest[:8])
+            reused.append(name)
+        else:
+            emitted.setdefault(name, []).append(digest)
+
+    new_record = {"version": RECORD_VERSION, "step": step, "phase": phase, "emitted": emitted,
+                  "context_percent": context_percent if context_percent is not None else record.get("context_percent")}
+    return result, new_record, reused
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("show", "reset"):
+        print("Usage: python delta_prompts.py show|reset [session_id]")
+        print(f"Delta prompts are enabled with {DELTA_ENV}=1; reset makes the next prompt resend every component")
+        return
+
+    from framework_state import FrameworkState
+
+    state_manager = FrameworkState(session_id=sys.argv[2] if len(sys.argv) > 2 else None, fast_path=True)
+    state = state_manager.load_current_state()
+    if not state:
+        print("❌ No active six-step session found")
+        return
+    path = record_path(state_manager.cache_dir, state_manager.session_id or state["problem_id"])
+
+    if sys.argv[1] == "reset":
+        path.unlink(missing_ok=True)
+        print(f"🔄 Next prompt resends every component ({path.name})")
+        return
+
+    record = load_record(path)
+    if record is None:
+        print("ℹ️  No components emitted yet - the next prompt sends everything")
+        return
+    print(f"📍 Step {record['step']} phase {record['phase']}")
+    for name, seen in record["emitted"].items():
+        print(f"   {name:<20} {len(seen)} version(s) emitted")
+
+
+if __name__ == "__main__":
+    main()
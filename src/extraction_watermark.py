@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Extraction Watermarks - Incremental preference extraction per meta file
+Records, for each meta file, the last interaction a step-done extraction
+pass was pointed at and a hash of the step's preferences at that time, so
+the next pass only has to read the new interaction range. A pass is pending
+until it is confirmed: the next pass over the same meta file finds the
+step's preferences changed since it was handed out. Unconfirmed passes (an
+aborted turn, or one that found nothing new) are offered again
+"""
+
+import os
+import sys
+import json
+import hashlib
+from pathlib import Path
+from datetime import datetime
+
+WATERMARK_FILE = ".extraction_watermarks.json"
+
+
+def watermark_path(meta_file):
+    """Watermarks live next to the meta files (meta/{problem_id}/.extraction_watermarks.json)"""
+    return Path(meta_file).parent / WATERMARK_FILE
+
+
+def load_watermarks(meta_file):
+    """All watermarks of a problem's meta directory, keyed by meta file name"""
+    try:
+        with open(watermark_path(meta_file), 'r') as f:
+            watermarks = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return watermarks if isinstance(watermarks, dict) else {}
+
+
+def save_watermarks(meta_file, watermarks):
+    """Atomically replace a problem's watermark file"""
+    path = watermark_path(meta_file)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def preferences_hash(components_dir, source):
+    """Hash of a step_info file's stored USER PREFERENCES"""
+    from preference_store import load_store, step_preferences
+    preferences = step_preferences(load_store(components_dir), source) or []
+    return hashlib.sha256("\n".join(preferences).encode('utf-8')).hexdigest()
+
+
+def confirmed_watermark(watermark, prefs_hash):
+    """
+    The confirmed part of a watermark - its pending pass counts as done once
+    the step's preferences (prefs_hash) changed since it was handed out.
+    None when nothing has been confirmed yet
+    """
+    pending = watermark.get("pending")
+    if pending and pending["preferences_hash"] != prefs_hash:
+        return {"last_interaction": pending["last_interaction"], "preferences_hash": prefs_hash,
+                "updated": pending["handed_out"]}
+    if "last_interaction" not in watermark:
+        return None
+    return {name: value for name, value in watermark.items() if name != "pending"}
+
+
+def next_extraction_range(meta_file, total_interactions, prefs_hash):
+    """
+    (first, last, watermark) interaction range a new extraction pass should read
+    after the last confirmed pass. Falls back to the whole file when nothing is
+    confirmed or the log now holds fewer interactions than the watermark (it
+    was rewritten)
+    """
+    watermark = load_watermarks(meta_file).get(Path(meta_file).name)
+    watermark = confirmed_watermark(watermark, prefs_hash) if watermark else None
+    if not watermark or watermark["last_interaction"] > total_interactions:
+        return 1, total_interactions, None
+    return watermark["last_interaction"] + 1, total_interactions, watermark
+
+
+def record_watermark(meta_file, watermark, last_interaction, prefs_hash):
+    """
+    Keep the confirmed watermark (as returned by next_extraction_range) and
+    record interactions up to last_interaction as handed to a pending pass
+    """
+    watermarks = load_watermarks(meta_file)
+    watermarks[Path(meta_file).name] = dict(watermark or {}, pending={
+        "last_interaction": last_interaction,
+        "preferences_hash": prefs_hash,
+        "handed_out": datetime.now().isoformat(),
+    })
+    save_watermarks(meta_file, watermarks)
+
+
+def reset_watermark(meta_file):
+    """Forget a meta file's watermark so the next pass re-reads everything"""
+    watermarks = load_watermarks(meta_file)
+    if watermarks.pop(Path(meta_file).name, None) is None:
+        return False
+    save_watermarks(meta_file, watermarks)
+    return True
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("show", "reset"):
+        print("Usage: python extraction_watermark.py [show|reset] meta/{problem_id}/step{N}.md")
+        return
+
+    meta_file = Path(sys.argv[2])
+    if sys.argv[1] == "show":
+        watermark = load_watermarks(meta_file).get(meta_file.name)
+        if watermark and "last_interaction" in watermark:
+            print(f"🔖 {meta_file.name}: analyzed through interaction {watermark['last_interaction']} "
+                  f"(preferences {watermark['preferences_hash'][:12]}, {watermark['updated']})")
+        else:
+            print(f"🔖 {meta_file.name}: nothing confirmed - next extraction reads every interaction")
+        if watermark and watermark.get("pending"):
+            pending = watermark["pending"]
+            print(f"⏳ Pending pass through interaction {pending['last_interaction']} ({pending['handed_out']}) - "
+                  f"confirmed once the step's preferences change")
+    elif reset_watermark(meta_file):
+        print(f"🔄 Reset watermark for {meta_file.name}")
+    else:
+        print(f"❌ No watermark recorded for {meta_file.name}")
+
+
+if __name__ == "__main__":
+    main()
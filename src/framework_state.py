@@ -4,24 +4,64 @@ Six-Step Framework State Management
 Handles detection-logic and state transitions as per solution map
 """
 
+import hook_profiler  # First import - profiled runs time the imports below
+import os
 import json
 import sys
+import time
 from pathlib import Path
-from datetime import datetime
+from contextlib import contextmanager
+from component_bundles import load_bundle
+from session_registry import (load_registry, save_registry, registry_path, resolve_session, register_session,
+                              unregister_session, session_state_file, normalize_cwd)
+from session_journal import append_event, append_record, journal_path, start_event_from_state, ensure_state_md
+
+# Fast-path hooks re-validate the directory layout at most this often
+LAYOUT_STAMP_TTL_SECONDS = 3600
+
+
+class StateConflictError(Exception):
+    """The state file was saved by another process since this state was loaded"""
+
+
+def write_atomic(path, text):
+    """Replace a file via a temp file and rename - readers never see a partial write"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
 
 class FrameworkState:
-    def __init__(self):
-        # Use absolute paths based on the script location
-        script_dir = Path(__file__).parent
-        self.state_file = script_dir / "current_state.json"
+    def __init__(self, root=None, fast_path=False, session_id=None, cwd=None):
+        # Fast path (hook entry points): quiet, validation only when the layout stamp is stale
+        self.quiet = fast_path
+        
+        # Use absolute paths based on the script location (or an explicit framework root)
+        script_dir = Path(root) if root else Path(__file__).parent
+        self.sessions_dir = script_dir / "sessions"
+        # Single-session state file, still used when no registered session matches
+        self.legacy_state_file = script_dir / "current_state.json"
         self.active_dir = script_dir / "active"
         self.meta_dir = script_dir / "meta"
         self.completed_dir = script_dir / "completed"
         self.components_dir = script_dir / "input_components"
+        self.cache_dir = script_dir / ".cache"
         self.framework_info_file = self.components_dir / "framework_info.md"
+        self.layout_stamp_file = self.cache_dir / "layout_verified"
+        self._state_locked = False
+        
+        # Resolve the session by explicit id (or SIXSTEP_SESSION), else by working directory
+        self.select_session(session_id, cwd)
         
         # Validate required directory structure exists
-        self._validate_paths()
+        with hook_profiler.stage("path_validation"):
+            if not fast_path:
+                self._validate_paths()
+            elif self._layout_stamp_stale():
+                self._validate_paths()
+                self._write_layout_stamp()
         
         # Step and phase definitions
         self.steps = {
@@ -96,7 +136,7 @@ class FrameworkState:
         if not self.active_dir.exists():
             try:
                 self.active_dir.mkdir(parents=True, exist_ok=True)
-                print(f"✅ Created active directory at: {self.active_dir.absolute()}")
+                self._report(f"✅ Created active directory at: {self.active_dir.absolute()}")
             except Exception as e:
                 raise FileNotFoundError(f"❌ Cannot create active directory at: {self.active_dir.absolute()}: {e}")
             
@@ -104,15 +144,15 @@ class FrameworkState:
         if not self.meta_dir.exists():
             try:
                 self.meta_dir.mkdir(parents=True, exist_ok=True)
-                print(f"✅ Created meta directory at: {self.meta_dir.absolute()}")
+                self._report(f"✅ Created meta directory at: {self.meta_dir.absolute()}")
             except Exception as e:
                 raise FileNotFoundError(f"❌ Cannot create meta directory at: {self.meta_dir.absolute()}: {e}")
         
         # Validate key input component files exist
         self._validate_input_components()
         
-        print(f"✅ Path validation successful. Working from: {Path.cwd().absolute()}")
-        print(f"✅ Framework state will be saved to: {self.state_file.absolute()}")
+        self._report(f"✅ Path validation successful. Working from: {Path.cwd().absolute()}")
+        self._report(f"✅ Framework state will be saved to: {self.state_file.absolute()}")
     
     def _validate_input_components(self):
         """Validate that required input component files exist"""
@@ -133,44 +173,144 @@ class FrameworkState:
         if missing_files:
             raise FileNotFoundError(f"❌ Missing input component files: {', '.join(missing_files)}")
         
-        print(f"✅ Input components validation successful. Found files in: {self.components_dir.absolute()}")
+        self._report(f"✅ Input components validation successful. Found files in: {self.components_dir.absolute()}")
+    
+    def _report(self, message):
+        """Print a validation message unless running in quiet fast-path mode"""
+        if not self.quiet:
+            print(message)
+    
+    def _layout_stamp_stale(self):
+        """Check whether the cached "layout verified" stamp needs re-validation"""
+        try:
+            stamp_mtime = os.stat(self.layout_stamp_file).st_mtime
+            components_mtime = os.stat(self.components_dir).st_mtime
+        except FileNotFoundError:
+            return True
+        return components_mtime > stamp_mtime or time.time() - stamp_mtime > LAYOUT_STAMP_TTL_SECONDS
+    
+    def _write_layout_stamp(self):
+        """Record a successful layout validation"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.layout_stamp_file.touch()
+        except OSError:
+            pass  # Validation simply runs again next time
+    
+    def _load_registry(self):
+        return load_registry(self.sessions_dir)
+    
+    def select_session(self, session_id=None, cwd=None, use_env=True):
+        """Point state_file at the resolved session (the legacy state file when none matches)"""
+        self.cwd = normalize_cwd(cwd)
+        registry = self._load_registry()
+        self.session_id = resolve_session(registry, session_id, self.cwd, use_env)
+        # Once a session was registered the (git-tracked) legacy file is ignored, not deleted
+        self.legacy_ignored = False
+        if self.session_id:
+            self.state_file = session_state_file(self.sessions_dir, self.session_id)
+        elif session_id:
+            # An explicit but unknown session never falls back to another one
+            self.state_file = session_state_file(self.sessions_dir, session_id)
+        else:
+            self.state_file = self.legacy_state_file
+            self.legacy_ignored = bool(registry.get("legacy_retired"))
+        return self.session_id
     
     def load_current_state(self):
         """Load current framework state"""
-        if not self.state_file.exists():
+        if self.legacy_ignored or not self.state_file.exists():
             return None
         
         try:
-            with open(self.state_file, 'r') as f:
+            with hook_profiler.stage("state_load"), open(self.state_file, 'r') as f:
                 return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            # Writes are atomic, so this is a damaged file rather than a write in progress
+            print(f"⚠️  Unreadable state file {self.state_file.absolute()}: {e}", file=sys.stderr)
             return None
     
+    @contextmanager
+    def state_lock(self):
+        """
+        Exclusive advisory lock on the state file (and STATE.md) for a
+        read-modify-write - re-entrant within one FrameworkState
+        """
+        if self._state_locked:
+            yield
+            return
+        from meta_log import locked
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with locked(self.state_file):
+            self._state_locked = True
+            try:
+                yield
+            finally:
+                self._state_locked = False
+    
     def save_state(self, state_data):
-        """Save framework state"""
+        """
+        Save framework state atomically, bumping its version counter
+        Raises StateConflictError when the file was saved since state_data was loaded
+        """
         try:
-            self.state_file.parent.mkdir(exist_ok=True)
-            with open(self.state_file, 'w') as f:
-                json.dump(state_data, f, indent=2)
+            with self.state_lock():
+                on_disk = self.load_current_state()
+                on_disk_version = on_disk.get("version", 0) if on_disk else 0
+                if on_disk and on_disk_version != state_data.get("version", 0):
+                    raise StateConflictError(
+                        f"State version {state_data.get('version', 0)} is stale - {self.state_file.name} is at version {on_disk_version}")
+                self._write_state(state_data)
+        except StateConflictError:
+            raise
         except PermissionError as e:
             raise Exception(f"❌ Permission denied writing to {self.state_file.absolute()}: {e}")
         except Exception as e:
             raise Exception(f"❌ Failed to save state to {self.state_file.absolute()}: {e}")
     
+    def _write_state(self, state_data):
+        """Write state under the state lock (caller holds it) with the next version number"""
+        state_data["version"] = state_data.get("version", 0) + 1
+        with hook_profiler.stage("state_write"):
+            write_atomic(self.state_file, json.dumps(state_data, indent=2))
+    
     def start_new_problem(self, problem_description):
         """Initialize new six-step session"""
+        from datetime import datetime
         try:
-            # Delete existing state file if it exists to ensure fresh start
-            if self.state_file.exists():
-                try:
-                    self.state_file.unlink()
-                    print(f"🗑️  Cleared existing state file: {self.state_file.absolute()}")
-                except Exception as e:
-                    print(f"⚠️  Warning: Could not clear existing state file: {e}")
-
+            from meta_log import locked
+            
             # Generate problem ID from description
             problem_id = problem_description.lower().replace(' ', '_').replace('-', '_')
             problem_id = ''.join(c for c in problem_id if c.isalnum() or c == '_')[:30]
+            
+            # Register a new session for this working directory - sessions of other
+            # directories keep running; this directory's previous session is cleared
+            self.sessions_dir.mkdir(parents=True, exist_ok=True)
+            with locked(registry_path(self.sessions_dir)):
+                registry = self._load_registry()
+                previous_id = resolve_session(registry, cwd=self.cwd)
+                if previous_id and registry["sessions"][previous_id]["cwd"] == self.cwd:
+                    unregister_session(registry, previous_id)
+                    previous_file = session_state_file(self.sessions_dir, previous_id)
+                    if previous_file.exists():
+                        previous_file.unlink()
+                        print(f"🗑️  Cleared existing session state: {previous_file.absolute()}")
+                # A restarted problem gets a fresh id - reusing active/{id}/ would append
+                # the new run to the previous run's journal
+                taken = {path.name for directory in (self.active_dir, self.meta_dir) if directory.exists()
+                         for path in directory.iterdir()}
+                self.session_id = register_session(registry, problem_id, self.cwd, taken)
+                # Unregistered directories stop composing against the stale (or placeholder) legacy state
+                registry["legacy_retired"] = True
+                save_registry(self.sessions_dir, registry)
+            self.legacy_ignored = False
+            self.state_file = session_state_file(self.sessions_dir, self.session_id)
+            
+            # Concurrent sessions get distinct problem IDs (and directories)
+            problem_id = self.session_id
             print(f"🆔 Generated problem ID: {problem_id}")
             
             # Create problem directory in active
@@ -220,7 +360,9 @@ class FrameworkState:
                 "current_phase": 1,
                 "started": datetime.now().isoformat(),
                 "status": "ACTIVE",
-                "problem_dir": str(problem_dir)
+                "problem_dir": str(problem_dir),
+                "session_id": self.session_id,
+                "cwd": self.cwd
             }
             
             # Save state with error handling
@@ -230,31 +372,15 @@ class FrameworkState:
             except Exception as e:
                 raise Exception(f"❌ Failed to save state file: {e}")
             
-            # Create STATE.md in problem directory
-            state_md_content = f"""# Problem: {problem_description}
-**Status**: ACTIVE
-**Current Step**: 1 - Understanding Problem Statement
-**Current Phase**: 1
-**Started**: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-
-## Progress Overview
-- [ ] Step 1: Understanding Problem Statement
-- [ ] Step 2: Current Situation Assessment
-- [ ] Step 3: Brainstorming Session
-- [ ] Step 4: Implementation
-- [ ] Step 5: Testing & Optimization  
-- [ ] Step 6: Insights Extraction
-
-## Session Log
-- {datetime.now().strftime('%H:%M')} User: Started six-step framework for: {problem_description}
-"""
-            
+            # Journal the start - STATE.md is rendered from the journal
             try:
-                with open(problem_dir / "STATE.md", 'w') as f:
-                    f.write(state_md_content)
-                print(f"📝 Created STATE.md: {(problem_dir / 'STATE.md').absolute()}")
+                append_event(problem_dir, "start", step="1", phase=1,
+                             **{field: state_data[field] for field in
+                                ("problem_id", "problem_description", "problem_dir", "session_id", "cwd")})
+                state_md = ensure_state_md(problem_dir, self.steps)
+                print(f"📝 Created session journal and STATE.md: {state_md.absolute()}")
             except Exception as e:
-                raise Exception(f"❌ Failed to create STATE.md file: {e}")
+                raise Exception(f"❌ Failed to create session journal: {e}")
             
             return state_data
             
@@ -262,68 +388,76 @@ class FrameworkState:
             print(f"❌ Error in start_new_problem: {e}")
             raise
     
-    def advance_step_phase(self):
-        """Move to next step or phase"""
-        current_state = self.load_current_state()
-        if not current_state:
-            return "No active six-step session found"
-        
-        step = current_state["current_step"]
-        phase = current_state["current_phase"]
-        
-        # Check if current step has more phases
-        if phase < len(self.steps[step]["phases"]):
-            # Advance to next phase
-            current_state["current_phase"] = phase + 1
-            new_step_name = f"{step} - {self.steps[step]['name']}"
-            new_phase_info = f"Phase {phase + 1}"
-        else:
-            # Advance to next step
-            next_step = str(int(step) + 1)
-            if next_step in self.steps:
-                current_state["current_step"] = next_step
-                current_state["current_phase"] = 1
-                new_step_name = f"{next_step} - {self.steps[next_step]['name']}"
-                new_phase_info = "Phase 1"
+    def advance_step_phase(self, current_state=None):
+        """
+        Move to next step or phase
+        Runs under the state lock from freshly read state - a caller's copy that
+        is behind the saved version is refreshed in place before advancing
+        """
+        with self.state_lock():
+            latest = self.load_current_state()
+            if not latest:
+                return "No active six-step session found"
+            if current_state is None:
+                current_state = latest
+            elif current_state.get("version", 0) != latest.get("version", 0):
+                print(f"🔄 State was saved by another process (version {current_state.get('version', 0)} → "
+                      f"{latest.get('version', 0)}) - advancing from the saved state")
+                current_state.clear()
+                current_state.update(latest)
+            
+            step = current_state["current_step"]
+            phase = current_state["current_phase"]
+            
+            # Check if current step has more phases
+            if phase < len(self.steps[step]["phases"]):
+                # Advance to next phase
+                current_state["current_phase"] = phase + 1
+                new_step_name = f"{step} - {self.steps[step]['name']}"
+                new_phase_info = f"Phase {phase + 1}"
+                event = "phase"
             else:
-                # Step 6 is complete - move to completed directory and reset state
-                if step == "6":
-                    return self._complete_framework_session(current_state)
+                # Advance to next step
+                next_step = str(int(step) + 1)
+                if next_step in self.steps:
+                    current_state["current_step"] = next_step
+                    current_state["current_phase"] = 1
+                    new_step_name = f"{next_step} - {self.steps[next_step]['name']}"
+                    new_phase_info = "Phase 1"
+                    event = "advance"
                 else:
-                    return "Framework complete - all 6 steps finished"
-        
-        self.save_state(current_state)
-        
-        # Update STATE.md
-        self._update_state_md(current_state, new_step_name, new_phase_info)
+                    # Step 6 is complete - move to completed directory and reset state
+                    if step == "6":
+                        return self._complete_framework_session(current_state)
+                    else:
+                        return "Framework complete - all 6 steps finished"
+            
+            self._write_state(current_state)
+            
+            # Journal the transition (still under the lock, so events stay in state order)
+            self.record_event(current_state, event, from_step=step, from_phase=phase,
+                              step=current_state["current_step"], phase=current_state["current_phase"])
         
         return f"Advanced to Step {current_state['current_step']}, {new_phase_info}: {new_step_name}"
     
-    def _update_state_md(self, state_data, step_name, phase_info):
-        """Update STATE.md file"""
+    def record_event(self, state_data, event, **fields):
+        """
+        Append an event to the problem's journal - problems started before the
+        journal existed get a start event synthesized from their state first
+        """
         problem_dir = Path(state_data["problem_dir"])
-        state_md = problem_dir / "STATE.md"
-        
-        if state_md.exists():
-            with open(state_md, 'r') as f:
-                content = f.read()
-            
-            # Update current step line
-            updated_content = ""
-            for line in content.split('\n'):
-                if line.startswith('**Current Step**:'):
-                    updated_content += f"**Current Step**: {step_name}\n"
-                elif line.startswith('**Current Phase**:'):
-                    updated_content += f"**Current Phase**: {phase_info}\n"
-                else:
-                    updated_content += line + "\n"
-            
-            with open(state_md, 'w') as f:
-                f.write(updated_content.rstrip() + "\n")
+        try:
+            if not journal_path(problem_dir).exists():
+                append_record(problem_dir, start_event_from_state(state_data))
+            return append_event(problem_dir, event, **fields)
+        except OSError as e:
+            print(f"⚠️  Could not journal {event} event in {problem_dir}: {e}", file=sys.stderr)
+            return None
     
     def _complete_framework_session(self, current_state):
         """Complete framework session: move to completed directory and reset state"""
         import shutil
+        from datetime import datetime
         
         problem_id = current_state["problem_id"]
         problem_dir = Path(current_state["problem_dir"])
@@ -342,29 +476,11 @@ class FrameworkState:
             shutil.move(str(problem_dir), str(completed_problem_dir))
             print(f"📁 Moved {problem_id} to completed: {completed_problem_dir}")
             
-            # Update STATE.md in completed directory to mark as COMPLETE
-            completed_state_md = completed_problem_dir / "STATE.md"
-            if completed_state_md.exists():
-                with open(completed_state_md, 'r') as f:
-                    content = f.read()
-                
-                # Update status and completion info
-                updated_content = ""
-                for line in content.split('\n'):
-                    if line.startswith('**Status**:'):
-                        updated_content += "**Status**: COMPLETE ✅\n"
-                    elif line.startswith('**Current Step**:'):
-                        updated_content += "**Current Step**: 6 - Insights Extraction\n"
-                    elif line.startswith('**Current Phase**:'):
-                        updated_content += "**Current Phase**: Phase 1  \n"
-                    elif '**Started**:' in line:
-                        updated_content += line + "\n"
-                        updated_content += f"**Completed**: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-                    else:
-                        updated_content += line + "\n"
-                
-                with open(completed_state_md, 'w') as f:
-                    f.write(updated_content.rstrip() + "\n")
+            # Journal the completion with the problem and render its final STATE.md
+            completed_state = dict(current_state, problem_dir=str(completed_problem_dir))
+            self.record_event(completed_state, "complete", step=current_state["current_step"],
+                              phase=current_state["current_phase"], completed_dir=str(completed_problem_dir))
+            ensure_state_md(completed_problem_dir, self.steps)
             
         except Exception as e:
             return f"❌ Error moving to completed directory: {e}"
@@ -376,12 +492,19 @@ class FrameworkState:
                 print(f"🗑️  Cleared current state file")
         except Exception as e:
             print(f"⚠️  Warning: Could not clear state file: {e}")
+        if self.session_id:
+            from meta_log import locked
+            with locked(registry_path(self.sessions_dir)):
+                registry = self._load_registry()
+                unregister_session(registry, self.session_id)
+                save_registry(self.sessions_dir, registry)
         
         return f"✅ Framework session completed! Problem '{problem_id}' moved to completed directory and state reset."
     
-    def get_input_components(self):
+    def get_input_components(self, current_state=None):
         """Get input components for current step/phase (detection-logic)"""
-        current_state = self.load_current_state()
+        if current_state is None:
+            current_state = self.load_current_state()
         if not current_state:
             return None
         
@@ -390,24 +513,7 @@ class FrameworkState:
         
         key = (step, phase)
         if key in self.input_component_files:
-            component_files = self.input_component_files[key]
-            components = {}
-            
-            # Read common framework info first
-            if self.framework_info_file.exists():
-                with open(self.framework_info_file, 'r') as f:
-                    components["framework_info"] = f.read().strip()
-            else:
-                components["framework_info"] = "❌ Missing framework_info.md"
-            
-            # Read step-specific components
-            for component_type, filename in component_files.items():
-                file_path = self.components_dir / filename
-                if file_path.exists():
-                    with open(file_path, 'r') as f:
-                        components[component_type] = f.read().strip()
-                else:
-                    components[component_type] = f"❌ Missing file: {filename}"
+            components = self.load_components(key)
             
             # Add problem context
             components["problem_id"] = current_state["problem_id"]
@@ -415,29 +521,42 @@ class FrameworkState:
             return components
         
         return None
+    
+    def load_components(self, key):
+        """Load the input components for a (step, phase) key from its compiled bundle"""
+        with hook_profiler.stage("component_reads"):
+            return dict(load_bundle(self, key))
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python framework_state.py [start|advance|status] [args...]")
+    hook_profiler.start("framework_state")
+    # Optional explicit session: framework_state.py --session ID command ...
+    args = sys.argv[1:]
+    session_id = None
+    if len(args) >= 2 and args[0] == "--session":
+        session_id, args = args[1], args[2:]
+    
+    if not args:
+        print("Usage: python framework_state.py [--profile] [--session ID] [start|advance|status] [args...]")
         return
     
-    state_manager = FrameworkState()
-    command = sys.argv[1]
+    state_manager = FrameworkState(session_id=session_id)
+    command = args[0]
     
     if command == "start":
-        if len(sys.argv) < 3:
+        if len(args) < 2:
             print("Usage: python framework_state.py start 'problem description'")
             return
-        problem_desc = " ".join(sys.argv[2:])
+        problem_desc = " ".join(args[1:])
         result = state_manager.start_new_problem(problem_desc)
         print(f"✅ Started six-step framework for: {problem_desc}")
         print(f"📁 Problem ID: {result['problem_id']}")
+        print(f"🔗 Session: {result['session_id']} (bound to {result['cwd']})")
         print(f"📍 Current: Step 1, Phase 1")
         print()
         print("## Framework Initialization Complete")
         print()
         print("✅ Six-step framework has been initialized for your problem.")
-        print("📁 Directory structure and STATE.md have been created.")
+        print("📁 Directory structure, session journal and STATE.md have been created.")
         print("🎯 Framework is now ready for use.")
         print()
         print("**Next Steps:**")
@@ -450,15 +569,21 @@ def main():
     elif command == "status":
         current_state = state_manager.load_current_state()
         if current_state:
-            components = state_manager.get_input_components()
+            components = state_manager.get_input_components(current_state)
             print(f"📋 Active Problem: {current_state['problem_description']}")
             print(f"📁 Problem ID: {current_state['problem_id']}")
+            if state_manager.session_id:
+                print(f"🔗 Session: {state_manager.session_id}")
             print(f"📍 Current: Step {current_state['current_step']}, Phase {current_state['current_phase']}")
+            # STATE.md is a view of the session journal, rendered when asked for
+            state_md = ensure_state_md(Path(current_state["problem_dir"]), state_manager.steps)
+            print(f"📝 STATE.md: {state_md}")
             if components:
                 print(f"🎯 Framework Info: {components['framework_info']}")
                 print(f"📝 Step Info: {components['step_info']}")
         else:
             print("❌ No active six-step session found")
 
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Hook Profiler - Per-stage latency of the hook entry points
+Enabled with --profile or SIXSTEP_PROFILE=1. Stages (imports, path
+validation, state load, component reads, context probe, composition, meta
+spool and meta-log writes, ...) are timed exclusively - a nested stage's
+time is not counted in its parent - and each run appends one sample to the rolling
+.cache/hook_metrics.jsonl. `python hook_profiler.py report` prints
+p50/p95/p99 per hook and stage
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+from contextlib import nullcontext, contextmanager
+from pathlib import Path
+
+# Imported first by the hook scripts, so the "imports" stage starts here
+IMPORTS_STARTED = time.perf_counter()
+
+PROFILE_ENV = "SIXSTEP_PROFILE"
+PROFILE_FLAG = "--profile"
+METRICS_FILE = Path(__file__).parent / ".cache" / "hook_metrics.jsonl"
+# Rolling window - past this size the file is cut back to its newest MAX_SAMPLES // 2 samples
+MAX_METRICS_BYTES = 1_000_000
+MAX_SAMPLES = 2000
+REPORT_PERCENTILES = (50, 95, 99)
+
+_NO_STAGE = nullcontext()
+_active = None
+
+
+class HookProfile:
+    """Exclusive stage timings for one hook run"""
+
+    def __init__(self, hook):
+        self.hook = hook
+        self.started = IMPORTS_STARTED
+        self.stages = {}
+        self._stack = []  # [name, start, time spent in nested stages]
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+        try:
+            yield
+        finally:
+            _, start, nested = self._stack.pop()
+            elapsed = time.perf_counter() - start
+            self.add(name, elapsed - nested)
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def sample(self):
+        total = time.perf_counter() - self.started
+        stages = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        stages["other"] = round(max(0.0, total * 1000 - sum(stages.values())), 3)
+        return {"ts": time.time(), "hook": self.hook, "total_ms": round(total * 1000, 3), "stages_ms": stages}
+
+
+def start(hook):
+    """
+    Begin profiling a hook run when --profile (removed from sys.argv) or
+    SIXSTEP_PROFILE is set - the sample is written at exit. Returns the
+    profile, or None when profiling is off
+    """
+    global _active
+    enabled = os.environ.get(PROFILE_ENV, "") not in ("", "0")
+    if PROFILE_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_FLAG)
+        enabled = True
+    if not enabled:
+        return None
+    _active = HookProfile(hook)
+    _active.add("imports", time.perf_counter() - IMPORTS_STARTED)
+    atexit.register(_finish)
+    return _active
+
+
+def stage(name):
+    """Context manager timing a stage of the active hook run (a no-op when not profiling)"""
+    return _active.stage(name) if _active else _NO_STAGE
+
+
+def _finish():
+    """Append the run's sample to the rolling metrics file"""
+    if _active is None:
+        return
+    try:
+        append_sample(_active.sample())
+    except OSError as e:
+        print(f"⚠️  Could not record hook profile: {e}", file=sys.stderr)
+
+
+def append_sample(sample, metrics_file=METRICS_FILE):
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(metrics_file, 'a') as f:
+        f.write(json.dumps(sample) + "\n")
+    if metrics_file.stat().st_size > MAX_METRICS_BYTES:
+        samples = load_samples(metrics_file)
+        tmp_path = metrics_file.with_name(f"{metrics_file.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.writelines(json.dumps(s) + "\n" for s in samples[-(MAX_SAMPLES // 2):])
+        os.replace(tmp_path, metrics_file)
+
+
+def load_samples(metrics_file=METRICS_FILE):
+    samples = []
+    try:
+        with open(metrics_file, 'r') as f:
+            for line in f:
+                try:
+                    samples.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return samples
+
+
+def report(samples, hook=None):
+    """{hook: {stage: [latencies in ms]}} with "total" per hook"""
+    by_hook = {}
+    for sample in samples:
+        if hook and sample["hook"] != hook:
+            continue
+        stages = by_hook.setdefault(sample["hook"], {"total": []})
+        stages["total"].append(sample["total_ms"])
+        for name, ms in sample["stages_ms"].items():
+            stages.setdefault(name, []).append(ms)
+    return by_hook
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("report", "clear"):
+        print("Usage: python hook_profiler.py report [hook]")
+        print("       python hook_profiler.py clear")
+        print(f"Profile a hook with {PROFILE_FLAG} or {PROFILE_ENV}=1, e.g. python compose_input.py {PROFILE_FLAG} 'question'")
+        return
+
+    if sys.argv[1] == "clear":
+        METRICS_FILE.unlink(missing_ok=True)
+        print(f"🗑️  Cleared {METRICS_FILE}")
+        return
+
+    from session_analytics import percentile
+
+    by_hook = report(load_samples(), sys.argv[2] if len(sys.argv) > 2 else None)
+    if not by_hook:
+        print(f"❌ No profiled runs in {METRICS_FILE}")
+        return
+    labels = "/".join(f"p{pct}" for pct in REPORT_PERCENTILES)
+    for hook, stages in sorted(by_hook.items()):
+        print(f"⏱️  {hook} ({len(stages['total'])} runs) - {labels} ms")
+        # Slowest stages first, by median
+        ordered = sorted((name for name in stages if name != "total"),
+                         key=lambda name: -percentile(stages[name], 50))
+        for name in ["total"] + ordered:
+            values = stages[name]
+            row = "/".join(f"{percentile(values, pct):.1f}" for pct in REPORT_PERCENTILES)
+            print(f"   {name:<16} {row} (n={len(values)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Load Benchmark - Synthetic-scale timings for the sixstep hot paths
+Builds a throwaway framework tree at a configurable scale (thousands of
+meta interactions, multi-MB step_info, hundreds of preferences, many
+completed problems, large input_dump folders) and times prompt
+composition, meta-log appends, step advances, preference consolidation
+and the step-done composition in-process. Results are JSON; --baseline
+compares medians against an earlier run and fails on regressions
+"""
+
+import io
+import sys
+import json
+import copy
+import time
+import random
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+from startup_benchmark import make_benchmark_tree
+
+RESULT_VERSION = 1
+REGRESSION_THRESHOLD = 1.25  # Median slower than baseline by this factor fails --baseline
+STEP_INFO_SOURCE = "step1/step_info.md"
+
+WORDS = ("framework component session prompt preference summary context interaction step phase "
+         "always never prefer test module cache index journal render bundle state review").split()
+
+
+def _text(rng, size):
+    """Roughly size characters of synthetic prose"""
+    words, length = [], 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _timestamp(base, minutes):
+    return (base + timedelta(minutes=minutes)).isoformat()
+
+
+def generate_tree(tmp_root, scale, seed=0):
+    """Grow a started benchmark tree to the requested scale; returns the state manager"""
+    from framework_state import FrameworkState
+    from meta_log import rebuild_index
+    from preference_store import load_store, save_store, ensure_migrated, set_step_preferences
+    from session_journal import append_record
+
+    rng = random.Random(seed)
+    tmp_root = Path(tmp_root)
+    state_manager = FrameworkState(root=tmp_root, fast_path=True, cwd=tmp_root)
+    state = state_manager.load_current_state()
+    base = datetime.now() - timedelta(days=30)
+
+    # Multi-MB step_info (hand-written part; USER PREFERENCES come from the store)
+    step_info = state_manager.components_dir / STEP_INFO_SOURCE
+    filler = "\n".join(f"- Prescriptive: {_text(rng, 180)}" for _ in range(scale["step_info_kb"] * 1024 // 200))
+    step_info.write_text(step_info.read_text() + "\n\n## SYNTHETIC GUIDANCE\n\n" + filler + "\n")
+
+    # Hundreds of stored preferences with metadata
+    store = load_store(state_manager.components_dir)
+    ensure_migrated(state_manager.components_dir, store)
+    preferences = [f"{rng.choice(('Always', 'Never', 'Prefer to'))} {_text(rng, rng.randint(40, 160))}"
+                   for _ in range(scale["preferences"])]
+    set_step_preferences(store, STEP_INFO_SOURCE, preferences)
+    for number, preference in enumerate(preferences):
+        store["steps"][STEP_INFO_SOURCE][preference] = {
+            "added": _timestamp(base, number), "confirmations": rng.randint(0, 5), "pinned": number % 50 == 0}
+    save_store(state_manager.components_dir, store)
+
+    # Thousands of meta interactions in the current problem's step 1 log
+    meta_file = state_manager.meta_dir / state["problem_id"] / "step1.md"
+    entries = [f"# Enhanced Prompt Log - Step 1\n**Problem ID**: {state['problem_id']}\n"
+               f"**Started**: {base.strftime('%Y-%m-%d %H:%M:%S')}\n\n---\n"]
+    for number in range(1, scale["interactions"] + 1):
+        entries.append(f"\n## Interaction {number}\n**Timestamp:** {_timestamp(base, number)}\n"
+                       f"**Context Usage:** {rng.uniform(5, 80):.1f}%\n**Prompt Bytes:** {rng.randint(15000, 40000)}\n"
+                       f"**Enhanced Prompt:**\n```\n[USER QUESTION]\n{_text(rng, 300)}\n\n[FRAMEWORK INSTRUCTION]\n"
+                       f"{_text(rng, 1200)}\n```\n\n**Claude Response Summary:**\n**Key Actions:** {_text(rng, 200)}\n\n---\n\n")
+    meta_file.write_text("".join(entries))
+    rebuild_index(meta_file)
+
+    # Large input_dump folder
+    dump_dir = Path(state["problem_dir"]) / "input_dump"
+    for number in range(scale["dump_files"]):
+        (dump_dir / f"dump_{number:04}.md").write_text(_text(rng, scale["dump_kb"] * 1024))
+
+    # Many completed problems, each with a journal and a rendered STATE.md
+    for number in range(scale["completed"]):
+        problem_dir = state_manager.completed_dir / f"synthetic_{number:04}"
+        problem_dir.mkdir(parents=True, exist_ok=True)
+        started = base + timedelta(hours=number)
+        append_record(problem_dir, {"ts": started.isoformat(), "event": "start", "problem_id": problem_dir.name,
+                                    "problem_description": f"Synthetic problem {number}",
+                                    "problem_dir": str(problem_dir), "session_id": problem_dir.name,
+                                    "cwd": str(tmp_root), "step": "1", "phase": 1})
+        for minutes, (step, phase) in enumerate([("2", 1), ("3", 1), ("3", 2), ("4", 1), ("5", 1), ("6", 1)], 1):
+            append_record(problem_dir, {"ts": (started + timedelta(minutes=minutes * 20)).isoformat(),
+                                        "event": "advance", "step": step, "phase": phase})
+        append_record(problem_dir, {"ts": (started + timedelta(hours=3)).isoformat(), "event": "complete",
+                                    "step": "6", "phase": 1})
+        (problem_dir / "STATE.md").write_text(f"# Problem: Synthetic problem {number}\n")
+
+    return FrameworkState(root=tmp_root, fast_path=True, cwd=tmp_root)
+
+
+def _reset_state(state_manager, step="1", phase=1):
+    """Put the session back on a step/phase between timed runs"""
+    from extraction_watermark import reset_watermark
+
+    with state_manager.state_lock():
+        state = state_manager.load_current_state()
+        state["current_step"], state["current_phase"] = step, phase
+        state_manager.save_state(state)
+    reset_watermark(state_manager.meta_dir / state["problem_id"] / "step1.md")
+
+
+def _fresh_context(state_manager):
+    """Seed a fresh context probe so no background `claude context` refresh starts"""
+    from context_usage import write_cached_usage
+    write_cached_usage(None, "benchmark", state_manager.cache_dir)
+
+
+def time_runs(runs, setup, body):
+    """Milliseconds per run of body(setup()) - setup is not timed"""
+    samples = []
+    for _ in range(runs):
+        argument = setup()
+        start = time.perf_counter()
+        body(argument)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_benchmarks(state_manager, runs):
+    """{name: [ms per run]} for each hot path"""
+    from session_context import SessionContext
+    from compose_input import compose_enhanced_prompt, log_enhanced_prompt
+    from step_done import run_step_done
+    from preference_index import PreferenceIndex
+    from preference_store import load_store, step_preferences
+    from update_input_components import consolidate_preferences
+
+    def session():
+        _fresh_context(state_manager)
+        return SessionContext(state_manager)
+
+    def quiet(call):
+        with redirect_stdout(io.StringIO()):
+            return call()
+
+    results = {}
+    _reset_state(state_manager)
+    results["compose_enhanced_prompt"] = time_runs(
+        runs, session, lambda s: compose_enhanced_prompt("benchmark question", s))
+
+    def composed():
+        s = session()
+        return s, compose_enhanced_prompt("benchmark question", s)
+    results["log_enhanced_prompt"] = time_runs(
+        runs, composed, lambda args: log_enhanced_prompt(args[1], "benchmark question", args[0]))
+
+    def at_step_one():
+        _reset_state(state_manager)
+        return state_manager
+    results["advance_step_phase"] = time_runs(runs, at_step_one, lambda sm: sm.advance_step_phase())
+
+    store = load_store(state_manager.components_dir)
+    existing = step_preferences(store, STEP_INFO_SOURCE)
+    index = PreferenceIndex.load(state_manager, store)
+    new = [f"Always benchmark preference {n} with distinct wording" for n in range(10)] + existing[:5]
+    results["consolidate_preferences"] = time_runs(
+        runs, lambda: copy.deepcopy(store["steps"]),
+        lambda metadata: quiet(lambda: consolidate_preferences(
+            existing, new, index=index, source=STEP_INFO_SOURCE, metadata=metadata)))
+
+    def completed_step_one():
+        _reset_state(state_manager)
+        return session()
+    results["step_done_composition"] = time_runs(runs, completed_step_one, lambda s: quiet(lambda: run_step_done(s)))
+
+    _reset_state(state_manager)
+    return results
+
+
+def summarize_runs(samples):
+    from session_analytics import percentile
+
+    return {"runs": len(samples), "cold_ms": round(samples[0], 3), "min_ms": round(min(samples), 3),
+            "median_ms": round(percentile(samples, 50), 3), "p95_ms": round(percentile(samples, 95), 3),
+            "max_ms": round(max(samples), 3)}
+
+
+def compare(result, baseline, threshold=REGRESSION_THRESHOLD):
+    """Benchmarks whose median regressed past threshold x the baseline median"""
+    regressions = []
+    for name, summary in result["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous and previous["median_ms"] > 0 and summary["median_ms"] > previous["median_ms"] * threshold:
+            regressions.append((name, previous["median_ms"], summary["median_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic-load benchmarks for the sixstep scripts')
+    parser.add_argument('--interactions', type=int, default=2000, help='Meta interactions in the step 1 log')
+    parser.add_argument('--step-info-kb', type=int, default=2048, help='Size of the synthetic step_info guidance')
+    parser.add_argument('--preferences', type=int, default=300, help='Stored preferences for step 1')
+    parser.add_argument('--completed', type=int, default=200, help='Completed problems')
+    parser.add_argument('--dump-files', type=int, default=200, help='Files in the input_dump folder')
+    parser.add_argument('--dump-kb', type=int, default=64, help='Size of each input_dump file')
+    parser.add_argument('--runs', type=int, default=10, help='Timed runs per benchmark')
+    parser.add_argument('--output', help='Write the JSON result here (default: stdout)')
+    parser.add_argument('--baseline', help='Earlier JSON result to compare medians against')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='Allowed median slowdown factor')
+    args = parser.parse_args()
+
+    scale = {"interactions": args.interactions, "step_info_kb": args.step_info_kb, "preferences": args.preferences,
+             "completed": args.completed, "dump_files": args.dump_files, "dump_kb": args.dump_kb}
+
+    with tempfile.TemporaryDirectory() as tmp_root:
+        make_benchmark_tree(tmp_root)
+        generate_start = time.perf_counter()
+        state_manager = generate_tree(tmp_root, scale)
+        generate_seconds = time.perf_counter() - generate_start
+        benchmarks = run_benchmarks(state_manager, args.runs)
+
+    result = {
+        "version": RESULT_VERSION,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "generate_seconds": round(generate_seconds, 3),
+        "benchmarks": {name: summarize_runs(samples) for name, samples in benchmarks.items()},
+    }
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"💾 Benchmark results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    for name, summary in result["benchmarks"].items():
+        print(f"⏱️  {name:<24} median {summary['median_ms']:.2f} ms (cold {summary['cold_ms']:.2f} ms, "
+              f"p95 {summary['p95_ms']:.2f} ms)", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        for name, before, after in regressions:
+            print(f"❌ {name} regressed: median {before:.2f} ms → {after:.2f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No benchmark slower than {args.threshold}x its baseline median", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Meta Log Writer - O(1) append path for meta interaction logs
+Keeps the interaction counter and the byte offset of the last
+`## Interaction N` heading in a small fixed-size sidecar index next to each
+meta file (older headings are found by meta_parser's scan), and serializes
+concurrent hook runs with an advisory lock so interaction numbers never
+collide. A missing or inconsistent sidecar is rebuilt from the markdown
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+from contextlib import contextmanager
+from meta_parser import scan_interaction_offsets
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms - appends are not serialized
+    fcntl = None
+
+INDEX_VERSION = 2
+INTERACTION_PREFIX = b"## Interaction "
+
+
+def index_path(log_file):
+    """Sidecar index location for a meta file (meta/{problem_id}/.step1.md.index)"""
+    log_file = Path(log_file)
+    return log_file.with_name(f".{log_file.name}.index")
+
+
+def lock_path(log_file):
+    log_file = Path(log_file)
+    return log_file.with_name(f".{log_file.name}.lock")
+
+
+@contextmanager
+def locked(log_file):
+    """Hold an exclusive advisory lock for a meta file"""
+    with open(lock_path(log_file), 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def rebuild_index(log_file):
+    """Rebuild the sidecar index from the markdown file"""
+    offsets = scan_interaction_offsets(log_file) if Path(log_file).exists() else []
+    index = {"version": INDEX_VERSION, "count": len(offsets), "last_offset": offsets[-1] if offsets else None}
+    save_index(log_file, index)
+    return index
+
+
+def save_index(log_file, index):
+    """Atomically replace the sidecar index"""
+    path = index_path(log_file)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+
+def _index_consistent(log_file, index):
+    """O(1) check that the last indexed heading is still where the index says"""
+    if index["last_offset"] is None:
+        return index["count"] == 0
+    try:
+        with open(log_file, 'rb') as f:
+            f.seek(index["last_offset"])
+            line = f.readline()
+    except OSError:
+        return False
+    return line.rstrip() == INTERACTION_PREFIX + str(index["count"]).encode()
+
+
+def load_index(log_file):
+    """Load the sidecar index, rebuilding it if missing or out of sync"""
+    if not Path(log_file).exists():
+        return {"version": INDEX_VERSION, "count": 0, "last_offset": None}
+    try:
+        with open(index_path(log_file), 'r') as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION and _index_consistent(log_file, index):
+            return index
+    except (OSError, ValueError, KeyError, IndexError):
+        pass
+    return rebuild_index(log_file)
+
+
+def append_interaction(log_file, render_header, render_entry):
+    """
+    Append the next interaction to a meta file and return its number
+    render_header() gives the file header (new files only); render_entry(n)
+    gives the interaction block, which must contain the `## Interaction n` heading
+    """
+    log_file = Path(log_file)
+    with locked(log_file):
+        index = load_index(log_file)
+        number = index["count"] + 1
+        is_new_file = number == 1 and not log_file.exists()
+
+        entry = render_entry(number)
+        text = (render_header() if is_new_file else "") + entry
+        data = text.encode('utf-8')
+        heading_at = data.index(INTERACTION_PREFIX + str(number).encode())
+
+        with open(log_file, 'wb' if is_new_file else 'ab') as f:
+            start = f.seek(0, os.SEEK_END)
+            f.write(data)
+
+        index["count"] = number
+        index["last_offset"] = start + heading_at
+        save_index(log_file, index)
+    return number
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("reindex", "show"):
+        print("Usage: python meta_log.py [reindex|show] meta/{problem_id}/step{N}.md")
+        return
+
+    log_file = Path(sys.argv[2])
+    index = rebuild_index(log_file) if sys.argv[1] == "reindex" else load_index(log_file)
+    print(f"📋 {log_file}: {index['count']} interactions")
+    print(f"📍 Last heading at byte {index['last_offset']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Meta Log Parser - Streaming reader for the meta_file_format.md contract
+Yields interaction records lazily with constant memory, seeks by
+interaction number (the meta_log.py sidecar holds the last heading's
+offset; older headings are found by a streaming scan) and reports
+unfilled [CLAUDE_RESPONSE_HERE ...] placeholders
+"""
+
+import sys
+import json
+from pathlib import Path
+
+INTERACTION_PREFIX = b"## Interaction "
+TIMESTAMP_PREFIX = b"**Timestamp:**"
+CONTEXT_PREFIX = b"**Context Usage:**"
+PROMPT_BYTES_PREFIX = b"**Prompt Bytes:**"
+PROMPT_MARKER = b"**Enhanced Prompt:**"
+SUMMARY_MARKER = b"**Claude Response Summary:**"
+PLACEHOLDER_MARKER = "[CLAUDE_RESPONSE_HERE"
+
+
+def _interaction_number(line):
+    """Interaction number of a `## Interaction N` heading line, else None"""
+    if not line.startswith(INTERACTION_PREFIX):
+        return None
+    number = line[len(INTERACTION_PREFIX):].strip()
+    return int(number) if number.isdigit() else None
+
+
+def _leading_number(value):
+    """First number in a metadata value such as b" ~12.5% (estimated)", else None"""
+    token = value.strip().lstrip(b"~").split(b" ")[0].rstrip(b"%").replace(b",", b"")
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def _strip_block(lines, fence=False):
+    """Join collected lines, dropping trailing blanks/separators (and the closing fence)"""
+    while lines and lines[-1].strip() in (b"", b"---"):
+        lines.pop()
+    if fence:
+        if lines and lines[0].strip() == b"```":
+            lines.pop(0)
+        if lines and lines[-1].strip() == b"```":
+            lines.pop()
+    return b"".join(lines).decode('utf-8', errors='replace').rstrip("\n")
+
+
+def iter_interactions(meta_file, start=None, include_prompt=True):
+    """
+    Lazily yield interaction records from a meta file
+    Each record: number, timestamp, context_percent and prompt_bytes (None for
+    entries logged before they were recorded), enhanced_prompt (None unless
+    include_prompt), response_summary, unfilled and byte_range (start, end). Only one
+    interaction is held in memory at a time; start seeks to that number
+    """
+    offset = seek_interaction(meta_file, start) if start else 0
+    if offset is None:
+        return
+
+    with open(meta_file, 'rb') as f:
+        f.seek(offset)
+        record = None
+        section = None  # None | "prompt" | "summary"
+        prompt_lines, summary_lines = [], []
+
+        for line in f:
+            number = None if section == "prompt" else _interaction_number(line)
+            if number is not None:
+                if record:
+                    yield _finish(record, offset, prompt_lines, summary_lines, include_prompt)
+                record = {"number": number, "timestamp": None, "context_percent": None,
+                          "prompt_bytes": None, "start": offset}
+                section = None
+                prompt_lines, summary_lines = [], []
+            elif record is not None:
+                if section is None and line.startswith(TIMESTAMP_PREFIX):
+                    record["timestamp"] = line[len(TIMESTAMP_PREFIX):].strip().decode('utf-8')
+                elif section is None and line.startswith(CONTEXT_PREFIX):
+                    record["context_percent"] = _leading_number(line[len(CONTEXT_PREFIX):])
+                elif section is None and line.startswith(PROMPT_BYTES_PREFIX):
+                    record["prompt_bytes"] = _leading_number(line[len(PROMPT_BYTES_PREFIX):])
+                elif line.startswith(PROMPT_MARKER) and section is None:
+                    section = "prompt"
+                elif line.startswith(SUMMARY_MARKER) and section == "prompt":
+                    section = "summary"
+                elif section == "prompt":
+                    if include_prompt:
+                        prompt_lines.append(line)
+                elif section == "summary":
+                    summary_lines.append(line)
+            offset += len(line)
+
+        if record:
+            yield _finish(record, offset, prompt_lines, summary_lines, include_prompt)
+
+
+def _finish(record, end, prompt_lines, summary_lines, include_prompt):
+    summary = _strip_block(summary_lines)
+    return {
+        "number": record["number"],
+        "timestamp": record["timestamp"],
+        "context_percent": record["context_percent"],
+        "prompt_bytes": record["prompt_bytes"],
+        "enhanced_prompt": _strip_block(prompt_lines, fence=True) if include_prompt else None,
+        "response_summary": summary,
+        "unfilled": PLACEHOLDER_MARKER in summary,
+        "byte_range": (record["start"], end),
+    }
+
+
+def scan_interaction_offsets(meta_file):
+    """Byte offsets of every interaction heading (streamed, prompts skipped)"""
+    return [r["byte_range"][0] for r in iter_interactions(meta_file, include_prompt=False)]
+
+
+def seek_interaction(meta_file, number):
+    """
+    Byte offset of `## Interaction {number}`, or None if absent
+    The last interaction comes from the sidecar index (verified there);
+    older ones are recovered by scanning the headings
+    """
+    from meta_log import load_index
+
+    index = load_index(meta_file)
+    if number == index["count"] and index["last_offset"] is not None:
+        offset = index["last_offset"]
+        with open(meta_file, 'rb') as f:
+            f.seek(offset)
+            if _interaction_number(f.readline()) == number:
+                return offset
+
+    # Older interaction, or the hint shifted by edits - scan
+    for record in iter_interactions(meta_file, include_prompt=False):
+        if record["number"] == number:
+            return record["byte_range"][0]
+    return None
+
+
+def last_interactions(meta_file, count, include_prompt=True):
+    """The last `count` interactions, read from their seek position"""
+    from meta_log import load_index
+
+    total = load_index(meta_file)["count"]
+    if total == 0 or count <= 0:
+        return []
+    return list(iter_interactions(meta_file, start=max(1, total - count + 1), include_prompt=include_prompt))
+
+
+def unfilled_placeholders(meta_file):
+    """Numbers of interactions whose response summary is still a placeholder"""
+    return [r["number"] for r in iter_interactions(meta_file, include_prompt=False) if r["unfilled"]]
+
+
+def main():
+    commands = ("list", "show", "last", "unfilled")
+    if len(sys.argv) < 3 or sys.argv[1] not in commands:
+        print("Usage: python meta_parser.py list|unfilled meta/{problem_id}/step{N}.md")
+        print("       python meta_parser.py show|last meta/{problem_id}/step{N}.md N")
+        return
+
+    command, meta_file = sys.argv[1], Path(sys.argv[2])
+    if command == "list":
+        for record in iter_interactions(meta_file, include_prompt=False):
+            status = "⏳ unfilled" if record["unfilled"] else "✅ summarized"
+            start, end = record["byte_range"]
+            print(f"## Interaction {record['number']} | {record['timestamp']} | bytes {start}-{end} | {status}")
+    elif command == "unfilled":
+        numbers = unfilled_placeholders(meta_file)
+        print(f"⏳ Unfilled placeholders ({len(numbers)}): {numbers}")
+    else:
+        if len(sys.argv) < 4:
+            print(f"Usage: python meta_parser.py {command} meta/{{problem_id}}/step{{N}}.md N")
+            return
+        n = int(sys.argv[3])
+        if command == "show":
+            record = next(iter_interactions(meta_file, start=n), None)
+            records = [record] if record and record["number"] == n else []
+        else:
+            records = last_interactions(meta_file, n)
+        for record in records:
+            print(json.dumps(record, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Meta Spool - Write-ahead spool for meta log entries
+compose_input.py writes each interaction as one small file in
+.cache/meta_spool/ (atomically, before the prompt is printed); the meta log
+append happens later - in the compose daemon after it replied, or at the
+start of the next compose_input.py run. Draining applies spooled records
+oldest first under a lock; an in-flight marker with the meta index count
+makes a drain interrupted mid-append neither lose nor repeat an entry.
+Readers of meta logs (step_done.py, analytics, `meta_spool.py drain` before
+filling a response placeholder) drain first
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+SPOOL_DIR = "meta_spool"
+SPOOL_VERSION = 1
+INFLIGHT_FILE = "inflight.json"
+RESPONSE_PLACEHOLDER = "[CLAUDE_RESPONSE_HERE - Replace with response summary using format from response_summary_format.md]"
+
+
+def spool_dir(cache_dir):
+    return Path(cache_dir) / SPOOL_DIR
+
+
+def spool_record(cache_dir, record):
+    """Durably queue one meta log entry - file names sort in spooling order"""
+    directory = spool_dir(cache_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{time.time_ns():020d}-{os.getpid()}.json"
+    tmp_path = directory / f".{name}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(dict(record, version=SPOOL_VERSION), f)
+    os.replace(tmp_path, directory / name)
+    return directory / name
+
+
+def render_header(record):
+    step, phase = record["step"], record["phase"]
+    return f"""# Enhanced Prompt Log - Step {step}{"" if step != "3" else " (Phase " + str(phase) + ")"}
+**Problem ID**: {record["problem_id"]}
+**Started**: {record["started"]}
+
+---
+"""
+
+
+def render_entry(record, interaction_count):
+    return f"""
+## Interaction {interaction_count}
+**Timestamp:** {record["timestamp"]}
+**Context Usage:** {record["context_line"]}
+**Prompt Bytes:** {record["prompt_bytes"]}
+**Enhanced Prompt:**
+```
+{record["prompt"]}
+```
+
+**Claude Response Summary:**
+{RESPONSE_PLACEHOLDER}
+
+---
+
+"""
+
+
+def _pending(directory):
+    return sorted(p for p in directory.glob("*.json") if p.name != INFLIGHT_FILE)
+
+
+def _recover(directory):
+    """Finish a drain that stopped between appending a record and removing it"""
+    from meta_log import load_index
+
+    inflight = directory / INFLIGHT_FILE
+    try:
+        with open(inflight, 'r') as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        inflight.unlink(missing_ok=True)
+        return
+    record_file = directory / marker["record"]
+    if record_file.exists() and load_index(marker["meta_file"])["count"] > marker["count"]:
+        record_file.unlink()  # Appended before the interruption
+    inflight.unlink()
+
+
+def drain(cache_dir):
+    """Append every spooled record to its meta log, oldest first - returns the number applied"""
+    from meta_log import locked, load_index, append_interaction
+
+    directory = spool_dir(cache_dir)
+    if not directory.exists() or not _pending(directory):
+        return 0
+    applied = 0
+    with locked(directory / "drain"):
+        _recover(directory)
+        for record_file in _pending(directory):
+            try:
+                with open(record_file, 'r') as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping unreadable spool record {record_file.name}: {e}", file=sys.stderr)
+                record_file.rename(record_file.with_suffix(".bad"))
+                continue
+            meta_file = Path(record["meta_file"])
+            meta_file.parent.mkdir(parents=True, exist_ok=True)
+            marker = {"record": record_file.name, "meta_file": str(meta_file), "count": load_index(meta_file)["count"]}
+            with open(directory / INFLIGHT_FILE, 'w') as f:
+                json.dump(marker, f)
+            append_interaction(meta_file, lambda: render_header(record), lambda n: render_entry(record, n))
+            record_file.unlink()
+            (directory / INFLIGHT_FILE).unlink()
+            applied += 1
+    return applied
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("drain", "status"):
+        print("Usage: python meta_spool.py drain|status [cache_dir]")
+        return
+
+    if len(sys.argv) > 2:
+        cache_dir = Path(sys.argv[2])
+    else:
+        from framework_state import FrameworkState
+        cache_dir = FrameworkState(fast_path=True).cache_dir
+
+    if sys.argv[1] == "drain":
+        applied = drain(cache_dir)
+        print(f"✅ Applied {applied} spooled meta log entries")
+        return
+
+    directory = spool_dir(cache_dir)
+    pending = _pending(directory) if directory.exists() else []
+    print(f"📥 {len(pending)} meta log entries waiting in {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Preference Consolidation - Value-aware size budget for USER PREFERENCES
+Scores each preference by recency, how often extraction re-confirmed it and
+explicit pinning, then keeps the highest-value set that fits the section
+size limit (0/1 knapsack over bullet sizes). Evicted preferences go to
+input_components/preference_archive.json and can be restored
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+from preference_store import SECTION_HEADER
+
+ARCHIVE_FILE = "preference_archive.json"
+
+# Score weights - a pinned preference is always kept
+BASE_SCORE = 1.0
+CONFIRMATION_SCORE = 2.0
+RECENCY_SCORE = 3.0
+RECENCY_HALF_LIFE_DAYS = 30
+
+
+def bullet_size(preference):
+    """Characters a preference adds to the section ("- " prefix plus joining newline)"""
+    return len(preference) + 3
+
+
+def section_capacity(max_size):
+    """Bullet characters available under max_size (the last bullet has no newline)"""
+    return max_size - len(SECTION_HEADER) + 1
+
+
+def _read_json(path, default):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path, data):
+    """Atomically replace a JSON file"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def preference_metadata(metadata, source, preference):
+    """
+    Metadata entry for one preference (created on first use) - metadata is the
+    preference store's {step_info path: {preference: entry}} mapping
+    """
+    return metadata.setdefault(source, {}).setdefault(preference, {"confirmations": 0, "pinned": False})
+
+
+def record_added(metadata, source, preference):
+    entry = preference_metadata(metadata, source, preference)
+    entry.setdefault("added", datetime.now().isoformat())
+
+
+def record_confirmation(metadata, source, preference):
+    """Extraction proposed this preference again"""
+    entry = preference_metadata(metadata, source, preference)
+    entry["confirmations"] = entry.get("confirmations", 0) + 1
+    entry["last_confirmed"] = datetime.now().isoformat()
+
+
+def preference_score(entry, now=None):
+    """Value of keeping a preference - recency decays with a 30 day half-life"""
+    now = now or datetime.now()
+    score = BASE_SCORE + CONFIRMATION_SCORE * entry.get("confirmations", 0)
+    last_seen = entry.get("last_confirmed") or entry.get("added")
+    if last_seen:
+        age_days = max(0.0, (now - datetime.fromisoformat(last_seen)).total_seconds() / 86400)
+        score += RECENCY_SCORE * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    return score
+
+
+def knapsack_select(sizes, values, capacity):
+    """Indexes of the maximum-value subset whose sizes fit in capacity"""
+    if capacity <= 0 or not sizes:
+        return set()
+    # best[c] = highest value using at most c characters; taken[i][c] marks item i as used there
+    best = [0.0] * (capacity + 1)
+    taken = []
+    for size, value in zip(sizes, values):
+        row = bytearray(capacity + 1)
+        for c in range(capacity, size - 1, -1):
+            candidate = best[c - size] + value
+            if candidate > best[c]:
+                best[c] = candidate
+                row[c] = 1
+        taken.append(row)
+
+    chosen, c = set(), capacity
+    for i in range(len(sizes) - 1, -1, -1):
+        if taken[i][c]:
+            chosen.add(i)
+            c -= sizes[i]
+    return chosen
+
+
+def select_preferences(source, preferences, metadata, max_size=2000):
+    """
+    (kept, evicted) preferences for a step_info file, kept in original order
+    Pinned preferences are kept first; the remaining capacity is filled by
+    value rather than by length
+    """
+    now = datetime.now()
+    entries = [preference_metadata(metadata, source, p) for p in preferences]
+    capacity = section_capacity(max_size)
+
+    pinned = {i for i, entry in enumerate(entries) if entry.get("pinned")}
+    capacity -= sum(bullet_size(preferences[i]) for i in pinned)
+    if capacity < 0:
+        print(f"⚠️  Pinned preferences alone exceed the {max_size} character limit - keeping all of them")
+
+    candidates = [i for i in range(len(preferences)) if i not in pinned]
+    chosen = knapsack_select([bullet_size(preferences[i]) for i in candidates],
+                             [preference_score(entries[i], now) for i in candidates],
+                             capacity)
+    keep = pinned | {candidates[j] for j in chosen}
+    kept = [p for i, p in enumerate(preferences) if i in keep]
+    evicted = [p for i, p in enumerate(preferences) if i not in keep]
+    return kept, evicted
+
+
+def archive_preferences(state_manager, source, evicted, metadata):
+    """Move evicted preferences (and their metadata) to the archive file"""
+    if not evicted:
+        return
+    archive_file = state_manager.components_dir / ARCHIVE_FILE
+    archive = _read_json(archive_file, [])
+    for preference in evicted:
+        entry = metadata.get(source, {}).pop(preference, {})
+        archive.append({
+            "source": source,
+            "preference": preference,
+            "evicted": datetime.now().isoformat(),
+            "score": round(preference_score(entry), 3),
+            "metadata": entry,
+        })
+    _write_json(archive_file, archive)
+
+
+def load_archive(state_manager):
+    return _read_json(state_manager.components_dir / ARCHIVE_FILE, [])
+
+
+def _find_preference(metadata, source, prefix):
+    matches = [p for p in metadata.get(source, {}) if p.startswith(prefix)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def main():
+    commands = ("scores", "pin", "unpin", "archive", "restore")
+    if len(sys.argv) < 2 or sys.argv[1] not in commands:
+        print("Usage: python preference_consolidation.py scores|archive")
+        print("       python preference_consolidation.py pin|unpin step{N}/step_info.md 'preference prefix'")
+        print("       python preference_consolidation.py restore N")
+        return
+
+    from framework_state import FrameworkState
+    from component_bundles import recompile_for_file
+    from meta_log import locked
+    from preference_store import store_path, load_store, save_store, ensure_migrated, set_step_preferences
+
+    state_manager = FrameworkState(fast_path=True)
+    # Commands rewrite the store - hold its lock from read to save
+    with locked(store_path(state_manager.components_dir)):
+        store = load_store(state_manager.components_dir)
+        if ensure_migrated(state_manager.components_dir, store):
+            save_store(state_manager.components_dir, store)
+        metadata = store["steps"]
+        command = sys.argv[1]
+
+        if command == "scores":
+            now = datetime.now()
+            for source in sorted(metadata):
+                print(f"📋 {source}")
+                for preference, entry in sorted(metadata[source].items(), key=lambda item: -preference_score(item[1], now)):
+                    pin = "📌 " if entry.get("pinned") else ""
+                    print(f"   {preference_score(entry, now):5.2f} {pin}{preference}")
+        elif command == "archive":
+            for number, item in enumerate(load_archive(state_manager), 1):
+                print(f"{number:3}. [{item['source']}] {item['preference']} (score {item['score']}, evicted {item['evicted']})")
+        elif command in ("pin", "unpin"):
+            if len(sys.argv) < 4:
+                print(f"Usage: python preference_consolidation.py {command} step{{N}}/step_info.md 'preference prefix'")
+                return
+            source = sys.argv[2]
+            preference = _find_preference(metadata, source, sys.argv[3])
+            if preference is None:
+                print(f"❌ No single preference in {source} starts with: {sys.argv[3]}")
+                return
+            metadata[source][preference]["pinned"] = command == "pin"
+            save_store(state_manager.components_dir, store)
+            print(f"{'📌 Pinned' if command == 'pin' else '📍 Unpinned'}: {preference}")
+        else:
+            if len(sys.argv) < 3:
+                print("Usage: python preference_consolidation.py restore N")
+                return
+            archive = load_archive(state_manager)
+            number = int(sys.argv[2])
+            if not 1 <= number <= len(archive):
+                print(f"❌ No archived preference #{number}")
+                return
+            item = archive.pop(number - 1)
+            source = item["source"]
+            preferences = list(metadata.get(source, {})) + [item["preference"]]
+            metadata.setdefault(source, {})[item["preference"]] = item["metadata"]
+            record_confirmation(metadata, source, item["preference"])
+
+            kept, evicted = select_preferences(source, preferences, metadata)
+            _write_json(state_manager.components_dir / ARCHIVE_FILE, archive)
+            archive_preferences(state_manager, source, evicted, metadata)
+            set_step_preferences(store, source, kept)
+            save_store(state_manager.components_dir, store)
+            recompile_for_file(state_manager, store_path(state_manager.components_dir))
+            print(f"♻️  Restored to {source}: {item['preference']}")
+            for preference in evicted:
+                print(f"📦 Archived to make room: {preference}")
+
+
+if __name__ == "__main__":
+    main()
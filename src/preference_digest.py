@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Preference Digest - Local pre-filter for step-done preference extraction
+Reduces a meta log to the user-authored question text and response
+summaries, ranks preference-like sentences (always/never/prefer statements,
+imperatives, corrections) and writes a size-capped digest that the
+step-done prompt references instead of the raw log
+"""
+
+import re
+import os
+import sys
+from pathlib import Path
+from meta_parser import iter_interactions
+
+DIGEST_MAX_BYTES = 16000
+MAX_CANDIDATES = 15
+
+# The question is the last prompt block and runs to the end of the prompt; logs
+# written before the stability-ordered layout still end it at the framework instruction
+QUESTION_START = "[USER QUESTION]\n"
+LEGACY_QUESTION_END = "\n\n[FRAMEWORK INSTRUCTION]"
+NO_SESSION_PREFIX = "User question: "
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+
+# (label, weight, pattern) - matched case-insensitively against one sentence
+PREFERENCE_SIGNALS = [
+    ("always/never", 3, re.compile(r"\b(always|never|every time|from now on|each time)\b", re.I)),
+    ("preference", 3, re.compile(r"\b(i prefer|prefer|i'd rather|i would rather|i like|i want|i'd like|i don't like|i hate)\b", re.I)),
+    ("correction", 2, re.compile(r"^(no|nope|actually|not like that|that's not|that is not|wrong)\b|\b(instead of|rather than|instead)\b", re.I)),
+    ("requirement", 2, re.compile(r"\b(should|must|make sure|be sure to|don't|do not|avoid|stop)\b", re.I)),
+    ("imperative", 1, re.compile(r"^(please\s+)?(use|add|keep|make|write|include|show|put|run|list|start|focus|prioritize|explain|give|remove|skip|check|read|create|format|ask|limit|split)\b", re.I)),
+]
+
+
+def extract_user_question(enhanced_prompt):
+    """User-authored text of a logged enhanced prompt (framework boilerplate stripped)"""
+    if enhanced_prompt is None:
+        return ""
+    start = enhanced_prompt.find(QUESTION_START)
+    if start != -1:
+        start += len(QUESTION_START)
+        end = enhanced_prompt.find(LEGACY_QUESTION_END, start)
+        return enhanced_prompt[start:end if end != -1 else None].strip()
+    # Prompts composed without an active session carry only the question
+    start = enhanced_prompt.find(NO_SESSION_PREFIX)
+    return enhanced_prompt[start + len(NO_SESSION_PREFIX):].strip() if start != -1 else ""
+
+
+def score_sentence(sentence):
+    """(score, matched signal labels) for one sentence"""
+    score, labels = 0, []
+    for label, weight, pattern in PREFERENCE_SIGNALS:
+        if pattern.search(sentence):
+            score += weight
+            labels.append(label)
+    return score, labels
+
+
+def rank_candidates(interactions, limit=MAX_CANDIDATES):
+    """Preference-like sentences across interactions, best first (questions outrank summaries)"""
+    candidates = []
+    for interaction in interactions:
+        for source, text in (("question", interaction["question"]), ("summary", interaction["summary"])):
+            for sentence in SENTENCE_SPLIT.split(text):
+                sentence = sentence.strip(" -*\t")
+                if len(sentence) < 8:
+                    continue
+                score, labels = score_sentence(sentence)
+                if score == 0:
+                    continue
+                if source == "question":
+                    score += 1  # The user's own words are the strongest evidence
+                candidates.append((score, interaction["number"], source, sentence, labels))
+    candidates.sort(key=lambda c: (-c[0], -c[1]))
+    return candidates[:limit]
+
+
+def _conversation_block(interaction):
+    return "\n".join([f"### Interaction {interaction['number']}",
+                      f"**User:** {interaction['question'] or '(empty)'}",
+                      f"**Summary:** {interaction['summary'] or '(none)'}",
+                      ""])
+
+
+def _omitted_lines(omitted):
+    if not omitted:
+        return []
+    return [f"_{omitted} older interactions omitted to stay within the digest size cap_", ""]
+
+
+def _head_lines(source_name, first, last, candidates, raw_bytes, digest_bytes):
+    lines = [f"# Preference Digest - {source_name}", ""]
+    removed = raw_bytes - digest_bytes
+    percent = (removed / raw_bytes * 100) if raw_bytes else 0
+    lines.append(f"**Interactions**: {first}-{last} | **Raw**: {raw_bytes:,} bytes | "
+                 f"**Digest**: {digest_bytes:,} bytes | **Removed**: {removed:,} bytes ({percent:.0f}%)")
+    lines.append("")
+
+    lines.append("## Candidate Preferences (ranked)")
+    if candidates:
+        for score, number, source, sentence, labels in candidates:
+            lines.append(f"- [{score}] Interaction {number} ({source}, {'/'.join(labels)}): {sentence}")
+    else:
+        lines.append("- None detected by the local pre-filter")
+    lines.append("")
+
+    lines.append("## Conversation")
+    return lines
+
+
+def _size(pieces):
+    """Bytes of "\n".join(pieces)"""
+    return sum(len(piece.encode('utf-8')) for piece in pieces) + max(len(pieces) - 1, 0)
+
+
+def build_digest(source_file, max_bytes=DIGEST_MAX_BYTES):
+    """
+    Digest markdown for an (expanded) meta file and its (raw_bytes, digest_bytes)
+    When over max_bytes, the oldest interactions are dropped from the
+    conversation section first; ranked candidates are always kept
+    """
+    interactions = []
+    for record in iter_interactions(source_file):
+        summary = record["response_summary"]
+        interactions.append({
+            "number": record["number"],
+            "question": extract_user_question(record["enhanced_prompt"]),
+            "summary": "" if record["unfilled"] else summary,
+        })
+
+    first = interactions[0]["number"] if interactions else 0
+    last = interactions[-1]["number"] if interactions else 0
+    candidates = rank_candidates(interactions)
+    raw_bytes = Path(source_file).stat().st_size
+
+    # Size the digest with the raw byte count in the report line and drop the
+    # oldest conversation blocks, tracking the size instead of re-rendering
+    source_name = Path(source_file).name
+    blocks = [_conversation_block(interaction) for interaction in interactions]
+    block_bytes = [len(block.encode('utf-8')) + 1 for block in blocks]  # Each with its joining newline
+    head_bytes = _size(_head_lines(source_name, first, last, candidates, raw_bytes, raw_bytes))
+    total = head_bytes + sum(block_bytes)
+    omitted = 0
+    while omitted < len(blocks) and total + _size(_omitted_lines(omitted)) + bool(omitted) > max_bytes:
+        total -= block_bytes[omitted]
+        omitted += 1
+
+    # The report line only changes in its numbers - a few renders settle them
+    digest_bytes = raw_bytes
+    for _ in range(3):
+        text = "\n".join(_head_lines(source_name, first, last, candidates, raw_bytes, digest_bytes)
+                         + blocks[omitted:] + _omitted_lines(omitted))
+        digest_bytes = len(text.encode('utf-8'))
+    return text, raw_bytes, digest_bytes
+
+
+def digest_view(source_file, max_bytes=DIGEST_MAX_BYTES):
+    """
+    Digest of an expanded meta file under meta/{problem_id}/digest/, same
+    file name as the source. Rebuilt only when the source changed.
+    Returns (digest_file, raw_bytes, digest_bytes)
+    """
+    source_file = Path(source_file)
+    # meta/{problem_id}/expanded/step1.md -> meta/{problem_id}/digest/step1.md
+    problem_dir = source_file.parent.parent if source_file.parent.name == "expanded" else source_file.parent
+    digest_file = problem_dir / "digest" / source_file.name
+
+    if digest_file.exists() and digest_file.stat().st_mtime_ns >= source_file.stat().st_mtime_ns:
+        return digest_file, source_file.stat().st_size, digest_file.stat().st_size
+
+    text, raw_bytes, digest_bytes = build_digest(source_file, max_bytes)
+    digest_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = digest_file.with_name(f"{digest_file.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, digest_file)
+    return digest_file, raw_bytes, digest_bytes
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python preference_digest.py meta/{problem_id}/step{N}.md [max_bytes]")
+        return
+
+    from prompt_blobs import expanded_view
+
+    meta_file = Path(sys.argv[1])
+    max_bytes = int(sys.argv[2]) if len(sys.argv) > 2 else DIGEST_MAX_BYTES
+    source_file = expanded_view(meta_file, meta_file.resolve().parent.parent) or meta_file
+    text, raw_bytes, digest_bytes = build_digest(source_file, max_bytes)
+    print(text)
+    print(f"📉 Removed {raw_bytes - digest_bytes:,} of {raw_bytes:,} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
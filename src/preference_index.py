@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Preference Index - MinHash/LSH near-duplicate index for USER PREFERENCES
+Covers the stored preferences of every step_info.md and
+phase*_step_info.md so a duplicate check only compares against LSH bucket
+candidates, across all steps. Persisted in .cache/preference_index.json
+and refreshed per step when that step's preference list changes
+"""
+
+import os
+import sys
+import json
+import hashlib
+
+INDEX_VERSION = 2
+NUM_PERM = 64
+BANDS = 16  # 4 rows per band - a 0.7 Jaccard pair shares a bucket ~99% of the time
+DUPLICATE_THRESHOLD = 0.7
+
+# Universal hash family h(x) = (a*x + b) mod p, fixed so signatures stay valid across runs
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), 'big') % (_MERSENNE_PRIME - 1) + 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), 'big') % _MERSENNE_PRIME)
+    for i in range(NUM_PERM)
+]
+
+
+def tokenize(text):
+    """Word set used for similarity (same tokens as check_duplication)"""
+    return set(text.lower().split())
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(tokens):
+    """MinHash signature of a token set"""
+    if not tokens:
+        return [_MERSENNE_PRIME] * NUM_PERM
+    hashed = [int.from_bytes(hashlib.blake2b(t.encode('utf-8'), digest_size=8).digest(), 'big') for t in tokens]
+    return [min((a * x + b) % _MERSENNE_PRIME for x in hashed) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature):
+    """One bucket key per LSH band"""
+    rows = NUM_PERM // BANDS
+    return [f"{band}:{hash(tuple(signature[band * rows:(band + 1) * rows]))}" for band in range(BANDS)]
+
+
+def _list_digest(preferences):
+    """Fingerprint of a step's preference list - a change triggers re-indexing"""
+    return hashlib.sha256("\n".join(preferences).encode('utf-8')).hexdigest()
+
+
+class PreferenceIndex:
+    """Persistent MinHash/LSH index over the stored USER PREFERENCES of all step_info files"""
+
+    def __init__(self, state_manager):
+        self.components_dir = state_manager.components_dir
+        self.path = state_manager.cache_dir / "preference_index.json"
+        self.sources = {}   # step_info path -> digest of its indexed preference list
+        self.entries = []   # {"source", "text", "signature"} (None once removed)
+        self.buckets = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, state_manager, store=None):
+        """Load the persisted index and bring it up to date with the preference store"""
+        index = cls(state_manager)
+        try:
+            with open(index.path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("num_perm") == NUM_PERM:
+                index.sources = data["sources"]
+                for entry in data["entries"]:
+                    index._insert(entry)
+        except (OSError, ValueError, KeyError):
+            index.dirty = True
+        index.refresh(store)
+        return index
+
+    def _insert(self, entry):
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+        for key in band_keys(entry["signature"]):
+            self.buckets.setdefault(key, []).append(entry_id)
+
+    def add(self, source, text):
+        """Index one preference under a step_info path relative to input_components"""
+        self._insert({"source": source, "text": text, "signature": minhash(tokenize(text))})
+        self.dirty = True
+
+    def remove_source(self, source):
+        """Drop every preference indexed for a step_info file"""
+        for entry_id, entry in enumerate(self.entries):
+            if entry and entry["source"] == source:
+                self.entries[entry_id] = None
+        self.sources.pop(source, None)
+        self.dirty = True
+
+    def refresh(self, store=None):
+        """Re-index steps whose preference list changed (and drop removed steps)"""
+        from preference_store import load_store
+
+        steps = (store or load_store(self.components_dir))["steps"]
+        for source in [s for s in self.sources if s not in steps]:
+            self.remove_source(source)
+        for source, entries in steps.items():
+            digest = _list_digest(list(entries))
+            if self.sources.get(source) == digest:
+                continue
+            self.remove_source(source)
+            for preference in entries:
+                self.add(source, preference)
+            self.sources[source] = digest
+
+    def find_duplicate(self, text, threshold=DUPLICATE_THRESHOLD):
+        """(source, existing preference, similarity) of the closest near-duplicate, or None"""
+        tokens = tokenize(text)
+        candidate_ids = set()
+        for key in band_keys(minhash(tokens)):
+            candidate_ids.update(self.buckets.get(key, ()))
+
+        best = None
+        for entry_id in candidate_ids:
+            entry = self.entries[entry_id]
+            if entry is None:
+                continue
+            similarity = jaccard(tokens, tokenize(entry["text"]))
+            if similarity >= threshold and (best is None or similarity > best[2]):
+                best = (entry["source"], entry["text"], similarity)
+        return best
+
+    def save(self):
+        """Atomically persist the index (compacting removed entries)"""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "num_perm": NUM_PERM,
+                "sources": self.sources,
+                "entries": [entry for entry in self.entries if entry],
+            }, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def stats(self):
+        live = [entry for entry in self.entries if entry]
+        per_source = {}
+        for entry in live:
+            per_source[entry["source"]] = per_source.get(entry["source"], 0) + 1
+        return {"preferences": len(live), "buckets": len(self.buckets), "per_source": per_source}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("stats", "rebuild", "check"):
+        print("Usage: python preference_index.py stats|rebuild")
+        print("       python preference_index.py check 'preference text'")
+        return
+
+    from framework_state import FrameworkState
+
+    state_manager = FrameworkState(fast_path=True)
+    if sys.argv[1] == "rebuild":
+        state_manager.cache_dir.joinpath("preference_index.json").unlink(missing_ok=True)
+    index = PreferenceIndex.load(state_manager)
+    index.save()
+
+    if sys.argv[1] == "check":
+        if len(sys.argv) < 3:
+            print("Usage: python preference_index.py check 'preference text'")
+            return
+        duplicate = index.find_duplicate(sys.argv[2])
+        if duplicate:
+            source, existing, similarity = duplicate
+            print(f"⚠️  Near-duplicate in {source} ({similarity:.2f}): '{existing}'")
+        else:
+            print("✅ No near-duplicate in any step_info file")
+        return
+
+    stats = index.stats()
+    print(f"📇 {stats['preferences']} preferences indexed in {stats['buckets']} LSH buckets")
+    for source, count in sorted(stats["per_source"].items()):
+        print(f"   {source}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Preference Store - Structured USER PREFERENCES for every step_info file
+Preferences and their metadata live in input_components/preferences.json
+keyed by step_info path. Component bundles render them into the step_info
+text at the marker left by migration, so updates never rewrite the
+hand-written markdown and loads need no regex scans
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+
+STORE_FILE = "preferences.json"
+STORE_VERSION = 1
+SECTION_HEADER = "## USER PREFERENCES (Auto-Generated)\n\n"
+PREFERENCES_MARKER = "<!-- USER PREFERENCES: rendered from preferences.json -->"
+# Pre-store metadata file written by preference_consolidation.py
+LEGACY_METADATA_FILE = "preference_metadata.json"
+
+
+def store_path(components_dir):
+    return Path(components_dir) / STORE_FILE
+
+
+def load_store(components_dir):
+    """{"version", "steps": {step_info path: {preference: metadata}}} - insertion ordered"""
+    try:
+        with open(store_path(components_dir), 'r') as f:
+            store = json.load(f)
+        if store.get("version") == STORE_VERSION and isinstance(store.get("steps"), dict):
+            return store
+    except (OSError, ValueError):
+        pass
+    return {"version": STORE_VERSION, "steps": {}}
+
+
+def save_store(components_dir, store):
+    """Atomically replace the store"""
+    path = store_path(components_dir)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(store, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def step_preferences(store, source):
+    """Ordered preference texts of a step_info file, or None if it is not in the store"""
+    entries = store["steps"].get(source)
+    return None if entries is None else list(entries)
+
+
+def set_step_preferences(store, source, preferences):
+    """Replace a step's preference list, keeping metadata of preferences that stay"""
+    entries = store["steps"].get(source, {})
+    store["steps"][source] = {p: entries.get(p, {"confirmations": 0, "pinned": False}) for p in preferences}
+
+
+def render_section(preferences):
+    """USER PREFERENCES markdown section for a preference list"""
+    if not preferences:
+        return SECTION_HEADER + "- No preferences configured"
+    return SECTION_HEADER + "\n".join(f"- {pref}" for pref in preferences)
+
+
+def render_step_info(content, preferences):
+    """step_info text with its stored preferences rendered at the marker (or appended)"""
+    if preferences is None:
+        return content
+    if PREFERENCES_MARKER in content:
+        return content.replace(PREFERENCES_MARKER, render_section(preferences), 1)
+    if not preferences:
+        return content
+    return content.rstrip() + "\n\n" + render_section(preferences) + "\n"
+
+
+def step_info_sources(components_dir):
+    """Relative paths of every step_info file that can hold USER PREFERENCES"""
+    components_dir = Path(components_dir)
+    # Numbered step directories only - step-done/ holds the extraction prompt, not a step
+    files = set(components_dir.glob("step[0-9]*/step_info.md")) | set(components_dir.glob("step[0-9]*/phase*_step_info.md"))
+    return sorted(str(path.relative_to(components_dir)) for path in files)
+
+
+def split_preferences_section(content):
+    """
+    (before, preferences, after) around a markdown USER PREFERENCES section -
+    the section is its header plus the bullet lines that directly follow it
+    """
+    start = content.find(SECTION_HEADER)
+    if start == -1:
+        return content, None, ""
+    lines = content[start + len(SECTION_HEADER):].split("\n")
+    bullets = 0
+    while bullets < len(lines) and lines[bullets].startswith("- "):
+        bullets += 1
+    preferences = [line[2:].strip() for line in lines[:bullets]]
+    if preferences == ["No preferences configured"]:
+        preferences = []
+    after = "\n".join(lines[bullets:])
+    return content[:start], preferences, ("\n" + after) if bullets else after
+
+
+def migrate_step_info(components_dir, source, store):
+    """Move a markdown USER PREFERENCES section into the store, leaving the marker behind"""
+    path = Path(components_dir) / source
+    content = path.read_text()
+    before, preferences, after = split_preferences_section(content)
+    if source not in store["steps"]:
+        set_step_preferences(store, source, preferences or [])
+    if preferences is not None:
+        path.write_text(before + PREFERENCES_MARKER + after)
+        return True
+    return False
+
+
+def ensure_migrated(components_dir, store):
+    """
+    Bring every step_info file (and legacy consolidation metadata) into the
+    store - returns True when the store changed and needs saving
+    """
+    changed = False
+    sources = step_info_sources(components_dir)
+    for source in sources:
+        if source not in store["steps"]:
+            migrate_step_info(components_dir, source, store)
+            changed = True
+    # Drop empty entries of files that are not step_info sources (e.g. step-done/)
+    for source in [s for s, entries in store["steps"].items() if s not in sources and not entries]:
+        del store["steps"][source]
+        changed = True
+
+    legacy_file = Path(components_dir) / LEGACY_METADATA_FILE
+    if legacy_file.exists():
+        with open(legacy_file, 'r') as f:
+            legacy = json.load(f)
+        for source, entries in legacy.items():
+            for preference, metadata in entries.items():
+                if preference in store["steps"].get(source, {}):
+                    store["steps"][source][preference] = metadata
+        legacy_file.unlink()
+        changed = True
+    return changed
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("migrate", "show", "render"):
+        print("Usage: python preference_store.py migrate|show")
+        print("       python preference_store.py render step{N}/step_info.md")
+        return
+
+    components_dir = Path(__file__).parent / "input_components"
+    store = load_store(components_dir)
+
+    if sys.argv[1] == "migrate":
+        if ensure_migrated(components_dir, store):
+            save_store(components_dir, store)
+            from component_bundles import compile_all
+            from framework_state import FrameworkState
+            compile_all(FrameworkState(fast_path=True))
+        print(f"✅ {len(store['steps'])} step_info files use {store_path(components_dir)}")
+    elif sys.argv[1] == "show":
+        for source, entries in store["steps"].items():
+            print(f"📋 {source}: {len(entries)} preferences")
+            for preference, metadata in entries.items():
+                print(f"   {'📌 ' if metadata.get('pinned') else ''}{preference}")
+    else:
+        if len(sys.argv) < 3:
+            print("Usage: python preference_store.py render step{N}/step_info.md")
+            return
+        source = sys.argv[2]
+        print(render_step_info((components_dir / source).read_text(), step_preferences(store, source)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Prompt Blob Store - Content-addressed storage for enhanced prompt components
+Meta logs store each distinct component body (framework info, step info,
+data sources, output requirements) once under meta/.blobs/ and refer to it
+by hash. Expansion reconstructs the exact meta_file_format.md markdown
+"""
+
+import os
+import re
+import sys
+import hashlib
+from pathlib import Path
+
+# Components large enough to be worth storing once instead of per interaction
+BLOB_COMPONENTS = ["framework_info", "step_info", "data_sources", "output_requirements"]
+MIN_BLOB_SIZE = 200
+
+BLOB_REF_PATTERN = re.compile(r'\[\[sixstep-blob:sha256:([0-9a-f]{64})\]\]')
+
+
+def blob_ref(digest):
+    """Inline reference written into meta logs in place of a component body"""
+    return f"[[sixstep-blob:sha256:{digest}]]"
+
+
+def blob_path(blob_dir, digest):
+    return Path(blob_dir) / digest[:2] / f"{digest}.md"
+
+
+def store_blob(blob_dir, content):
+    """Store content once (write-once, atomic) and return its SHA-256 digest"""
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    path = blob_path(blob_dir, digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return digest
+
+
+def load_blob(blob_dir, digest, cache=None):
+    """Read a blob's content (memoized in cache when given)"""
+    if cache is not None and digest in cache:
+        return cache[digest]
+    with open(blob_path(blob_dir, digest), 'r') as f:
+        content = f.read()
+    if cache is not None:
+        cache[digest] = content
+    return content
+
+
+def dehydrate_prompt(enhanced_prompt, components, blob_dir):
+    """Replace component bodies inside an enhanced prompt with blob references"""
+    for component_type in BLOB_COMPONENTS:
+        body = components.get(component_type)
+        if not body or len(body) < MIN_BLOB_SIZE or body not in enhanced_prompt:
+            continue
+        digest = store_blob(blob_dir, body)
+        enhanced_prompt = enhanced_prompt.replace(body, blob_ref(digest), 1)
+    return enhanced_prompt
+
+
+def expand_text(text, blob_dir, cache=None):
+    """Replace every blob reference in text with the stored component body"""
+    if cache is None:
+        cache = {}
+    return BLOB_REF_PATTERN.sub(lambda m: load_blob(blob_dir, m.group(1), cache), text)
+
+
+def expand_file(meta_file, output_file, blob_dir, start_offset=None):
+    """
+    Stream a compact meta file into its fully expanded markdown form
+    With start_offset, only the file header and the interactions from that
+    byte offset on are written
+    """
+    cache = {}
+    tmp_path = Path(output_file).with_name(f"{Path(output_file).name}.{os.getpid()}.tmp")
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(meta_file, 'r') as src, open(tmp_path, 'w') as dst:
+        if start_offset is not None:
+            # Copy the header, then jump to the first requested interaction
+            for line in src:
+                if line.startswith("## Interaction "):
+                    break
+                dst.write(line)
+            src.seek(start_offset)
+        for line in src:
+            dst.write(expand_text(line, blob_dir, cache) if "[[sixstep-blob:" in line else line)
+    os.replace(tmp_path, output_file)
+    return Path(output_file)
+
+
+def expanded_view(meta_file, meta_dir, start_interaction=1):
+    """
+    Expanded copy of a meta file under meta/{problem_id}/expanded/
+    (step{N}_from{K}.md when starting at interaction K > 1). Regenerated
+    only when the compact file changed since the last expansion
+    """
+    meta_file = Path(meta_file)
+    if not meta_file.exists():
+        return None
+    if start_interaction > 1:
+        output_file = meta_file.parent / "expanded" / f"{meta_file.stem}_from{start_interaction}{meta_file.suffix}"
+    else:
+        output_file = meta_file.parent / "expanded" / meta_file.name
+    if output_file.exists() and output_file.stat().st_mtime_ns >= meta_file.stat().st_mtime_ns:
+        return output_file
+
+    start_offset = None
+    if start_interaction > 1:
+        from meta_parser import seek_interaction
+        start_offset = seek_interaction(meta_file, start_interaction)
+        if start_offset is None:
+            return None
+    return expand_file(meta_file, output_file, Path(meta_dir) / ".blobs", start_offset)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("expand", "stats"):
+        print("Usage: python prompt_blobs.py expand meta/{problem_id}/step{N}.md [output.md]")
+        print("       python prompt_blobs.py stats meta/{problem_id}/step{N}.md")
+        return
+
+    meta_file = Path(sys.argv[2])
+    # meta/{problem_id}/step{N}.md -> blobs live in meta/.blobs
+    blob_dir = meta_file.resolve().parent.parent / ".blobs"
+
+    if sys.argv[1] == "expand":
+        if len(sys.argv) > 3:
+            output_file = expand_file(meta_file, sys.argv[3], blob_dir)
+        else:
+            output_file = expanded_view(meta_file, blob_dir.parent)
+        print(f"📄 Expanded meta file written to: {output_file}")
+    else:
+        compact_size = meta_file.stat().st_size
+        expanded_size = 0
+        cache = {}
+        with open(meta_file, 'r') as f:
+            for line in f:
+                expanded_size += len(expand_text(line, blob_dir, cache).encode('utf-8'))
+        print(f"📦 Compact size: {compact_size:,} bytes")
+        print(f"📄 Expanded size: {expanded_size:,} bytes")
+        if compact_size:
+            print(f"📉 Ratio: {expanded_size / compact_size:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
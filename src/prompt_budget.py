@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Prompt Budget - Fit composed prompts into a token budget
+With SIXSTEP_PROMPT_BUDGET set, components are split into markdown sections
+(at # / ## headings and --- rules) and, when the prompt is over budget, the
+lowest-priority sections are truncated or dropped: data_sources detail
+first, then the oldest USER PREFERENCES, then output requirements.
+framework_info, the step's own instructions and sections whose heading says
+CRITICAL always stay. Each trimmed component ends with a note naming what
+was cut and where the full text lives
+"""
+
+import os
+import re
+import sys
+
+BUDGET_ENV = "SIXSTEP_PROMPT_BUDGET"
+
+# Lower priorities are trimmed first; components not listed are never trimmed
+COMPONENT_PRIORITIES = {"data_sources": 1, "output_requirements": 3}
+PREFERENCES_PRIORITY = 2
+PREFERENCES_TITLE = "USER PREFERENCES"
+REQUIRED_MARKER = "CRITICAL"
+# Tokens kept back for the trim note appended to each trimmed component
+NOTE_RESERVE = 80
+MIN_KEPT_TOKENS = 40  # Smaller remainders are dropped rather than truncated
+
+SECTION_BREAK = re.compile(r"^(#{1,2} |---\s*$)")
+
+
+def prompt_budget():
+    """Token budget for the whole prompt from SIXSTEP_PROMPT_BUDGET (None when unset or invalid)"""
+    try:
+        budget = int(os.environ.get(BUDGET_ENV, "0"))
+    except ValueError:
+        return None
+    return budget if budget > 0 else None
+
+
+def split_sections(text):
+    """Markdown sections split before # / ## headings and --- rules (outside code fences)"""
+    sections, current, in_fence = [], [], False
+    for line in text.splitlines(keepends=True):
+        if line.startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence and current and SECTION_BREAK.match(line):
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def section_title(section):
+    """Heading (or first line) of a section, without markdown decoration"""
+    for line in section.splitlines():
+        title = line.strip().strip("#*-: ").strip()
+        if title:
+            return title[:60]
+    return "(blank)"
+
+
+def required_sections(sections):
+    """Per-section flags, True under a CRITICAL heading (sections split off by --- rules belong to the heading above)"""
+    flags, required = [], False
+    for section in sections:
+        if section.startswith("#"):
+            required = REQUIRED_MARKER in section_title(section)
+        flags.append(required)
+    return flags
+
+
+def _candidates(components):
+    """[(priority, name, index)] of trimmable sections, the first to trim first"""
+    from token_count import COMPONENTS
+
+    candidates = []
+    for name in COMPONENTS:
+        sections = split_sections(components.get(name) or "")
+        for index, (section, required) in enumerate(zip(sections, required_sections(sections))):
+            title = section_title(section)
+            if required or not section.strip("-\n "):
+                continue
+            if name == "step_info" and title.startswith(PREFERENCES_TITLE):
+                candidates.append((PREFERENCES_PRIORITY, name, index))
+            elif name in COMPONENT_PRIORITIES:
+                candidates.append((COMPONENT_PRIORITIES[name], name, index))
+    # Later sections are the detail - trim them before earlier ones of the same priority
+    return sorted(candidates, key=lambda c: (c[0], -c[2]))
+
+
+def _truncate(section, keep_tokens, oldest_first):
+    """
+    Whole lines of a section worth at most keep_tokens, keeping its heading -
+    preference sections lose their oldest (first) bullets, others their tail
+    """
+    from token_count import count_tokens
+
+    heading, *lines = section.splitlines(keepends=True)
+    kept, used = [], count_tokens(heading)
+    for line in (reversed(lines) if oldest_first else lines):
+        cost = count_tokens(line)
+        if used + cost > keep_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if oldest_first:
+        kept.reverse()
+    return heading + "".join(kept)
+
+
+def trim_components(components, available, sources=None):
+    """
+    (components, trimmed) with the component bodies cut down to about
+    `available` tokens - trimmed is [{"component", "section", "action", "tokens"}]
+    listing every dropped or truncated section. sources maps component names to
+    the file holding their full text, named in the trim note
+    """
+    from token_count import COMPONENTS, count_tokens
+
+    sections = {name: split_sections(components.get(name) or "") for name in COMPONENTS}
+    costs = {name: [count_tokens(s) for s in parts] for name, parts in sections.items()}
+    excess = sum(sum(c) for c in costs.values()) - available
+
+    trimmed = []
+    for _, name, index in _candidates(components):
+        if excess <= 0:
+            break
+        section, cost = sections[name][index], costs[name][index]
+        excess += NOTE_RESERVE if not any(t["component"] == name for t in trimmed) else 0
+        keep = cost - excess
+        title = section_title(section)
+        if keep >= MIN_KEPT_TOKENS:
+            sections[name][index] = _truncate(section, keep, oldest_first=title.startswith(PREFERENCES_TITLE))
+            removed = cost - count_tokens(sections[name][index])
+            action = "truncated"
+        else:
+            sections[name][index] = ""
+            removed, action = cost, "dropped"
+        excess -= removed
+        trimmed.append({"component": name, "section": title, "action": action, "tokens": removed})
+
+    result = dict(components)
+    for name in {t["component"] for t in trimmed}:
+        cuts = [t for t in trimmed if t["component"] == name]
+        result[name] = "".join(sections[name]).rstrip() + "\n\n" + trim_note(cuts, (sources or {}).get(name))
+    return result, trimmed
+
+
+def trim_note(cuts, source=None):
+    """Note appended to a trimmed component, naming what was cut"""
+    listed = "; ".join(f"{t['action']} \"{t['section']}\"" for t in cuts)
+    where = f" - read {source} for the full text" if source else ""
+    return f"✂️ Trimmed for the prompt token budget: {listed}{where}"
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python prompt_budget.py 'user question'")
+        print(f"Shows what {BUDGET_ENV} would trim from the current prompt (e.g. {BUDGET_ENV}=8000)")
+        return
+
+    from framework_state import FrameworkState
+    from session_context import SessionContext
+
+    if prompt_budget() is None:
+        print(f"ℹ️  {BUDGET_ENV} is not set - prompts are composed in full")
+        return
+    session = SessionContext(FrameworkState(fast_path=True))
+    question = " ".join(sys.argv[1:])
+    if session.prompt_components(question) is None:
+        print("❌ No active six-step session found")
+        return
+    report = session.prompt_tokens(question)
+    print(f"🔢 Prompt: {report['total']:,} tokens (budget {prompt_budget():,})")
+    if not session.trimmed_sections:
+        print("✅ Fits the budget - nothing trimmed")
+    elif report["total"] > prompt_budget():
+        print("⚠️  The sections that always stay exceed the budget on their own")
+    for cut in session.trimmed_sections:
+        print(f"   ✂️  {cut['component']}: {cut['action']} \"{cut['section']}\" (-{cut['tokens']:,} tokens)")
+
+
+if __name__ == "__main__":
+    main()
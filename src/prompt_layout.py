@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Prompt Layout - Prefix-stable ordering of enhanced prompt blocks
+compose_input.py and step_done.py hand over blocks tagged with how often
+they change (framework, step, problem, interaction). Blocks are emitted most
+stable first, so consecutive prompts share the longest possible byte-identical
+prefix for provider-side prompt caching; SIXSTEP_CACHE_MARKERS=1 adds a
+cache-breakpoint marker where each tier ends. `python prompt_layout.py
+stability` measures the shared prefixes of consecutive logged prompts
+"""
+
+import os
+import sys
+
+# Stability tiers, most stable first
+FRAMEWORK, STEP, PROBLEM, INTERACTION = range(4)
+
+HEADER = "[SIX-STEP FRAMEWORK ACTIVE]"
+MARKERS_ENV = "SIXSTEP_CACHE_MARKERS"
+CACHE_MARKER = "<!-- sixstep:cache-breakpoint -->"
+BLOCK_SEPARATOR = "\n\n"
+# Providers only cache prefixes of at least ~1024 tokens (about 3 KB of prompt text)
+MIN_CACHEABLE_BYTES = 3072
+
+FRAMEWORK_INSTRUCTION = ("[FRAMEWORK INSTRUCTION]\n"
+                         "Before answering, read the current STATE.md and relevant step files from the "
+                         "active directory in the problem context. Follow the step/phase instructions exactly.")
+
+
+def markers_enabled():
+    return os.environ.get(MARKERS_ENV, "") not in ("", "0")
+
+
+def render_prompt(blocks, markers=None):
+    """
+    Join (tier, text) blocks after the header, most stable tier first -
+    blocks of one tier keep their given order. With markers, a cache
+    breakpoint follows every tier except the last
+    """
+    if markers is None:
+        markers = markers_enabled()
+    ordered = sorted(blocks, key=lambda block: block[0])
+    parts = [HEADER]
+    for number, (tier, text) in enumerate(ordered):
+        if markers and number and tier != ordered[number - 1][0]:
+            parts.append(CACHE_MARKER)
+        parts.append(text)
+    return BLOCK_SEPARATOR.join(parts)
+
+
+def shared_prefix(previous, current):
+    """Length in bytes of the common prefix of two prompts"""
+    a, b = previous.encode('utf-8'), current.encode('utf-8')
+    limit = min(len(a), len(b))
+    # Compare in large chunks first, then byte by byte within the first differing chunk
+    start = 0
+    step = 4096
+    while start < limit and a[start:start + step] == b[start:start + step]:
+        start += step
+    start = min(start, limit)
+    while start < limit and a[start] == b[start]:
+        start += 1
+    return start
+
+
+def cached_bytes(previous, current):
+    """
+    Bytes of current a provider could serve from cache after previous - with
+    markers only up to the last breakpoint inside the shared prefix, without
+    them the whole shared prefix (0 below the minimum cacheable size)
+    """
+    prefix = shared_prefix(previous, current)
+    encoded = current.encode('utf-8')
+    if CACHE_MARKER in current:
+        marker = CACHE_MARKER.encode('utf-8')
+        end = encoded.rfind(marker, 0, prefix)
+        prefix = end + len(marker) if end != -1 and end + len(marker) <= prefix else 0
+    return prefix if prefix >= MIN_CACHEABLE_BYTES else 0
+
+
+def measure_file(meta_file, blob_dir):
+    """{"interactions", "prompt_bytes", "cached_bytes", "hits"} over consecutive interactions of a meta log"""
+    from meta_parser import iter_interactions
+    from prompt_blobs import expand_text
+
+    cache, previous = {}, None
+    totals = {"interactions": 0, "prompt_bytes": 0, "cached_bytes": 0, "hits": 0}
+    for record in iter_interactions(meta_file):
+        if not record["enhanced_prompt"]:
+            continue
+        prompt = expand_text(record["enhanced_prompt"], blob_dir, cache)
+        totals["interactions"] += 1
+        totals["prompt_bytes"] += len(prompt.encode('utf-8'))
+        if previous is not None:
+            served = cached_bytes(previous, prompt)
+            totals["cached_bytes"] += served
+            totals["hits"] += served > 0
+        previous = prompt
+    return totals
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != "stability":
+        print("Usage: python prompt_layout.py stability [problem_id]")
+        print(f"Reports the prompt-cache hit rate of consecutive logged prompts ({MARKERS_ENV}=1 adds cache breakpoints)")
+        return
+
+    from framework_state import FrameworkState
+    from meta_spool import drain
+
+    state_manager = FrameworkState(fast_path=True)
+    drain(state_manager.cache_dir)
+    pattern = f"{sys.argv[2]}/step*.md" if len(sys.argv) > 2 else "*/step*.md"
+    blob_dir = state_manager.meta_dir / ".blobs"
+    overall = {"interactions": 0, "prompt_bytes": 0, "cached_bytes": 0, "hits": 0}
+    for meta_file in sorted(state_manager.meta_dir.glob(pattern)):
+        totals = measure_file(meta_file, blob_dir)
+        if totals["interactions"] < 2:
+            continue
+        for name in overall:
+            overall[name] += totals[name]
+        share = totals["cached_bytes"] / totals["prompt_bytes"] * 100
+        print(f"   {meta_file.parent.name}/{meta_file.name}: {totals['hits']}/{totals['interactions'] - 1} "
+              f"cache hits, {share:.1f}% of prompt bytes cacheable")
+
+    if not overall["prompt_bytes"]:
+        print("❌ No meta log with two or more logged prompts")
+        return
+    share = overall["cached_bytes"] / overall["prompt_bytes"] * 100
+    print(f"📦 {overall['cached_bytes']:,} of {overall['prompt_bytes']:,} prompt bytes ({share:.1f}%) "
+          f"would be served from a prefix cache across {overall['interactions']} interactions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Section Retrieval - Question-aware selection of component sections
+data_sources and output_requirements are split into markdown sections and
+indexed for BM25 when their bundle is compiled, so the index is built once
+per component version. With SIXSTEP_SECTION_TOP_K set, a prompt keeps
+framework_info, step_info, each component's opening section and CRITICAL
+sections, plus only the top-k other sections that match the question
+"""
+
+import os
+import re
+import sys
+import math
+
+from prompt_budget import split_sections, section_title, required_sections
+
+TOP_K_ENV = "SIXSTEP_SECTION_TOP_K"
+INDEX_KEY = "section_index"
+INDEX_VERSION = 1
+RETRIEVABLE = ("data_sources", "output_requirements")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TERM_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = set("""a an and are as at be by do does for from how i in is it its me my of on or so that the
+this to was we what when where which who why will with you your can should would""".split())
+
+
+def retrieval_top_k():
+    """Sections to retrieve per prompt from SIXSTEP_SECTION_TOP_K (None when unset or invalid)"""
+    try:
+        top_k = int(os.environ.get(TOP_K_ENV, "0"))
+    except ValueError:
+        return None
+    return top_k if top_k > 0 else None
+
+
+def tokenize(text):
+    """Lowercase index terms - stopwords and single characters dropped, plural s stripped"""
+    terms = []
+    for term in TERM_PATTERN.findall(text.lower()):
+        if len(term) < 2 or term in STOPWORDS:
+            continue
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def build_section_index(components):
+    """
+    {"version", "sections": {component: [{"tf", "length"}]}, "df", "count", "avgdl"}
+    for the retrievable components - headings are counted twice
+    """
+    sections, df = {}, {}
+    for name in RETRIEVABLE:
+        entries = []
+        for section in split_sections(components.get(name) or ""):
+            terms = tokenize(section) + tokenize(section_title(section))
+            tf = {}
+            for term in terms:
+                tf[term] = tf.get(term, 0) + 1
+            for term in tf:
+                df[term] = df.get(term, 0) + 1
+            entries.append({"tf": tf, "length": len(terms)})
+        sections[name] = entries
+    lengths = [entry["length"] for entries in sections.values() for entry in entries]
+    return {"version": INDEX_VERSION, "sections": sections, "df": df, "count": len(lengths),
+            "avgdl": sum(lengths) / len(lengths) if lengths else 0}
+
+
+def bm25_scores(index, question):
+    """{(component, section number): BM25 score} for a question"""
+    terms = set(tokenize(question))
+    count, avgdl = index["count"], index["avgdl"] or 1
+    scores = {}
+    for name, entries in index["sections"].items():
+        for number, entry in enumerate(entries):
+            score = 0.0
+            for term in terms:
+                frequency = entry["tf"].get(term)
+                if not frequency:
+                    continue
+                documents = index["df"][term]
+                idf = math.log(1 + (count - documents + 0.5) / (documents + 0.5))
+                score += idf * frequency * (K1 + 1) / (frequency + K1 * (1 - B + B * entry["length"] / avgdl))
+            scores[(name, number)] = score
+    return scores
+
+
+def select_sections(components, question, top_k, sources=None):
+    """
+    (components, omitted) keeping the mandatory sections and the top_k
+    optional sections most relevant to the question - omitted is
+    [{"component", "section"}]. Components stay whole when the index is
+    missing or nothing in the question matches an optional section
+    """
+    index = components.get(INDEX_KEY)
+    if not index or index.get("version") != INDEX_VERSION:
+        return components, []
+
+    split = {name: split_sections(components.get(name) or "") for name in RETRIEVABLE}
+    if any(len(split[name]) != len(index["sections"].get(name, ())) for name in RETRIEVABLE):
+        return components, []
+    optional = set()
+    for name, sections in split.items():
+        for number, (section, required) in enumerate(zip(sections, required_sections(sections))):
+            if number > 0 and not required and section.strip("-\n "):
+                optional.add((name, number))
+
+    scores = bm25_scores(index, question)
+    ranked = sorted((key for key in optional if scores[key] > 0), key=lambda key: -scores[key])
+    if not ranked:
+        return components, []
+    chosen = set(ranked[:top_k])
+
+    result, omitted = dict(components), []
+    for name, sections in split.items():
+        cut = [section_title(sections[n]) for n in range(len(sections)) if (name, n) in optional - chosen]
+        if not cut:
+            continue
+        kept = "".join(s for n, s in enumerate(sections) if (name, n) not in optional - chosen)
+        result[name] = kept.rstrip() + "\n\n" + retrieval_note(cut, (sources or {}).get(name))
+        omitted.extend({"component": name, "section": title} for title in cut)
+    return result, omitted
+
+
+def retrieval_note(titles, source=None):
+    """Note appended to a component whose sections were left out"""
+    listed = "; ".join(f"\"{title}\"" for title in titles)
+    where = f" - read {source} for the full text" if source else ""
+    return f"🔎 Sections picked for this question; left out: {listed}{where}"
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python section_retrieval.py 'user question'")
+        print(f"Ranks the current step's sections for a question ({TOP_K_ENV}=k enables retrieval in prompts)")
+        return
+
+    from framework_state import FrameworkState
+    from session_context import SessionContext
+
+    session = SessionContext(FrameworkState(fast_path=True))
+    components = session.components
+    if not components or INDEX_KEY not in components:
+        print("❌ No active six-step session found")
+        return
+    question = " ".join(sys.argv[1:])
+    scores = bm25_scores(components[INDEX_KEY], question)
+    for (name, number), score in sorted(scores.items(), key=lambda item: -item[1]):
+        title = section_title(split_sections(components[name])[number])
+        print(f"   {score:6.2f}  {name}: {title}")
+    top_k = retrieval_top_k()
+    print(f"🔎 {TOP_K_ENV}={top_k}" if top_k else f"ℹ️  {TOP_K_ENV} is not set - prompts include every section")
+
+
+if __name__ == "__main__":
+    main()
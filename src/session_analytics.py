@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Session Analytics - Per-step timing and throughput across all problems
+Scans active/, completed/ and meta/ once and keeps per-file aggregates in
+.cache/analytics.json. Later runs rescan only files whose size or mtime
+changed, resuming meta logs after the last cached interaction. Reports
+per-step duration, interaction count, prompt bytes and context percentage
+as percentiles across problems
+"""
+
+import os
+import re
+import sys
+import json
+from datetime import datetime
+from pathlib import Path
+
+CACHE_FILE = "analytics.json"
+CACHE_VERSION = 1
+PERCENTILES = (50, 90, 95)
+
+META_FILE_PATTERN = re.compile(r"^step(\d)(?:_phase\d)?\.md$")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-pct * len(ordered) // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(values):
+    """{"n", "p50", "p90", "p95", "max"} for a list of numbers"""
+    summary = {"n": len(values)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = percentile(values, pct)
+    summary["max"] = max(values) if values else None
+    return summary
+
+
+def _signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def scan_meta_file(meta_file, cached=None):
+    """
+    {"signature", "samples": [[timestamp, context_percent, prompt_bytes], ...]}
+    for a meta log - a grown file is resumed after its cached interactions
+    """
+    from meta_parser import iter_interactions
+
+    signature = _signature(meta_file)
+    if cached and cached["signature"] == signature:
+        return cached
+    samples = list(cached["samples"]) if cached and cached["signature"][1] <= signature[1] else []
+
+    records = iter_interactions(meta_file, start=len(samples) + 1 if samples else None, include_prompt=False)
+    for record in records:
+        if record["number"] != len(samples) + 1:
+            # Numbering no longer matches the cache (edited log) - rescan from the top
+            return scan_meta_file(meta_file) if samples else {"signature": signature, "samples": samples}
+        samples.append([record["timestamp"], record["context_percent"], record["prompt_bytes"]])
+    return {"signature": signature, "samples": samples}
+
+
+def scan_journal(problem_dir, cached=None):
+    """
+    {"signature", "durations": {step: seconds}, "open_step", "started", "completed"}
+    for a problem's session journal - only steps the problem has left are timed
+    """
+    from session_journal import journal_path, read_events
+
+    signature = _signature(journal_path(problem_dir))
+    if cached and cached["signature"] == signature:
+        return cached
+
+    durations, current, entered = {}, None, None
+    started = completed = None
+    for event in read_events(problem_dir):
+        ts = datetime.fromisoformat(event["ts"])
+        if event["event"] == "start":
+            durations, current, entered, started = {}, event["step"], ts, event["ts"]
+            continue
+        if current is None or "step" not in event:
+            continue
+        durations[current] = durations.get(current, 0.0) + (ts - entered).total_seconds()
+        if event["event"] == "complete":
+            current, completed = None, event["ts"]
+        else:
+            current, entered = event["step"], ts
+    if current is not None:
+        durations.pop(current, None)  # Still in progress
+    return {"signature": signature, "durations": durations, "open_step": current,
+            "started": started, "completed": completed}
+
+
+def _load_cache(cache_file):
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+        if cache.get("version") == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {"version": CACHE_VERSION, "meta": {}, "journals": {}}
+
+
+def _save_cache(cache_file, cache):
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_file)
+
+
+def update_cache(state_manager, rebuild=False):
+    """Bring the analytics cache up to date - returns (cache, files rescanned)"""
+    from session_journal import JOURNAL_FILE
+    from meta_spool import drain
+
+    drain(state_manager.cache_dir)  # Count interactions still waiting in the spool
+    root = state_manager.active_dir.parent
+    cache_file = state_manager.cache_dir / CACHE_FILE
+    old = {"meta": {}, "journals": {}} if rebuild else _load_cache(cache_file)
+    cache = {"version": CACHE_VERSION, "meta": {}, "journals": {}}
+    rescanned = 0
+
+    for problems_dir in (state_manager.active_dir, state_manager.completed_dir):
+        for journal in sorted(problems_dir.glob(f"*/{JOURNAL_FILE}")):
+            key = str(journal.parent.relative_to(root))
+            entry = scan_journal(journal.parent, old["journals"].get(key))
+            rescanned += entry is not old["journals"].get(key)
+            cache["journals"][key] = entry
+
+    for meta_file in sorted(state_manager.meta_dir.glob("*/step*.md")):
+        if not META_FILE_PATTERN.match(meta_file.name):
+            continue
+        key = str(meta_file.relative_to(root))
+        entry = scan_meta_file(meta_file, old["meta"].get(key))
+        rescanned += entry is not old["meta"].get(key)
+        cache["meta"][key] = entry
+
+    # Files removed since the last run also change the cache
+    if rebuild or rescanned or cache["meta"].keys() != old["meta"].keys() \
+            or cache["journals"].keys() != old["journals"].keys():
+        _save_cache(cache_file, cache)
+    return cache, rescanned
+
+
+def build_report(cache, now=None):
+    """Per-step and lifecycle percentiles from the analytics cache"""
+    now = now or datetime.now()
+    steps = {str(n): {"duration": [], "interactions": [], "prompt_bytes": [], "context_percent": []} for n in range(1, 7)}
+
+    for journal in cache["journals"].values():
+        for step, seconds in journal["durations"].items():
+            steps[step]["duration"].append(seconds)
+
+    # Step 3 logs its phases to two files - interactions are counted per problem and step
+    interactions = {}
+    for key, entry in cache["meta"].items():
+        path = Path(key)
+        step = META_FILE_PATTERN.match(path.name).group(1)
+        problem_step = (path.parent.name, step)
+        interactions[problem_step] = interactions.get(problem_step, 0) + len(entry["samples"])
+        for _, context_percent, prompt_bytes in entry["samples"]:
+            if prompt_bytes is not None:
+                steps[step]["prompt_bytes"].append(prompt_bytes)
+            if context_percent is not None:
+                steps[step]["context_percent"].append(context_percent)
+    for (_, step), count in interactions.items():
+        steps[step]["interactions"].append(count)
+
+    time_to_complete, open_age = [], []
+    for journal in cache["journals"].values():
+        if not journal["started"]:
+            continue
+        started = datetime.fromisoformat(journal["started"])
+        if journal["completed"]:
+            time_to_complete.append((datetime.fromisoformat(journal["completed"]) - started).total_seconds())
+        else:
+            open_age.append((now - started).total_seconds())
+
+    return {
+        "problems": {"journaled": len(cache["journals"]), "with_meta_logs": len({p for p, _ in interactions})},
+        "steps": {step: {metric: summarize(values) for metric, values in metrics.items()} for step, metrics in steps.items()},
+        "time_to_complete": summarize(time_to_complete),
+        "open_age": summarize(open_age),
+    }
+
+
+def _duration(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+def _number(value, fmt="{:.0f}"):
+    return "-" if value is None else fmt.format(value)
+
+
+def _row(summary, formatter):
+    return "/".join(formatter(summary[f"p{pct}"]) for pct in PERCENTILES) + f" (n={summary['n']})"
+
+
+def print_report(report, steps):
+    """Human-readable percentile tables"""
+    labels = "/".join(f"p{pct}" for pct in PERCENTILES)
+    problems = report["problems"]
+    print(f"📊 Six-step analytics: {problems['journaled']} journaled problems, "
+          f"{problems['with_meta_logs']} with meta logs ({labels})")
+    for step, metrics in report["steps"].items():
+        print(f"\n📍 Step {step} - {steps[step]['name']}")
+        print(f"   ⏱️  Duration:      {_row(metrics['duration'], _duration)}")
+        print(f"   💬 Interactions:  {_row(metrics['interactions'], _number)}")
+        print(f"   📦 Prompt bytes:  {_row(metrics['prompt_bytes'], lambda v: _number(v, '{:,.0f}'))}")
+        print(f"   🧠 Context %:     {_row(metrics['context_percent'], lambda v: _number(v, '{:.1f}'))}")
+    print(f"\n✅ Start → completion: {_row(report['time_to_complete'], _duration)}")
+    print(f"📂 Open problems in active/: age {_row(report['open_age'], _duration)}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] not in ("--rebuild", "--json"):
+        print("Usage: python session_analytics.py [--rebuild] [--json]")
+        return
+
+    from framework_state import FrameworkState
+
+    state_manager = FrameworkState(fast_path=True)
+    cache, rescanned = update_cache(state_manager, rebuild="--rebuild" in sys.argv)
+    report = build_report(cache)
+    if "--json" in sys.argv:
+        print(json.dumps(report, indent=2))
+        return
+    print_report(report, state_manager.steps)
+    print(f"🗂️  {rescanned} of {len(cache['meta']) + len(cache['journals'])} files rescanned "
+          f"(cache: {state_manager.cache_dir / CACHE_FILE})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Session Context - Single-load state for one hook invocation
+Loads framework state and input components once and is threaded through
+prompt composition, meta logging and preference extraction. Also holds the
+per-hook I/O budgets and the check-budget command, which measures them with
+the accounting in tests/io_accounting.py
+"""
+
+import sys
+import hook_profiler
+from framework_state import FrameworkState
+
+# Maximum file operations (under the framework root) per hook invocation.
+# Ceilings for the single-load target - session registry and state read once,
+# one component bundle, the cached context probe and token counts, then the
+# meta log append (compose) or the advance, watermark and digest (step-done) -
+# with about 25% headroom. They are limits, not measurements: raise one only
+# with the reason in the commit message. tests/test_io_budget.py enforces them
+IO_BUDGETS = {
+    "compose": {"reads": 14, "writes": 8, "stats": 26},
+    "step-done": {"reads": 19, "writes": 8, "stats": 24},
+}
+
+
+class SessionContext:
+    """State, components and context usage for one invocation, each loaded at most once"""
+
+    def __init__(self, state_manager=None):
+        self.state_manager = state_manager or FrameworkState()
+        self.state = self.state_manager.load_current_state()
+        self._components = None
+        self._keyed_components = {}
+        self._context_usage = None
+        self._prompt_components = {}
+        self._prompt_tokens = {}
+        self._context_components = {}
+        self._context_tokens = {}
+        self.omitted_sections = []
+        self.reused_components = []
+        self._delta_record = None
+        self.trimmed_sections = []
+
+    @property
+    def components(self):
+        """Input components for the current step/phase (None without an active session)"""
+        if self._components is None and self.state:
+            self._components = self.state_manager.get_input_components(self.state)
+        return self._components
+
+    def load_components(self, key):
+        """Input components for an explicit (step, phase) key such as ("step-done", 1)"""
+        if key not in self._keyed_components:
+            self._keyed_components[key] = self.state_manager.load_components(key)
+        return self._keyed_components[key]
+
+    def context_usage(self):
+        """(context_info, error) from the context usage provider, probed once"""
+        if self._context_usage is None:
+            with hook_profiler.stage("context_probe"):
+                from context_usage import get_context_usage
+                self._context_usage = get_context_usage(self.state_manager.cache_dir)
+        return self._context_usage
+
+    def prompt_components(self, user_question):
+        """
+        Components of the prompt for user_question - narrowed to the relevant
+        sections (SIXSTEP_SECTION_TOP_K), trimmed to the prompt token budget
+        (SIXSTEP_PROMPT_BUDGET) and reduced to what this step has not sent yet
+        (SIXSTEP_DELTA_PROMPTS) when those are set
+        """
+        if user_question not in self._prompt_components:
+            from section_retrieval import retrieval_top_k, select_sections
+            from prompt_budget import prompt_budget, trim_components
+            from delta_prompts import delta_enabled
+            components, top_k, budget = self.components, retrieval_top_k(), prompt_budget()
+            if components and top_k:
+                components, self.omitted_sections = select_sections(
+                    components, user_question, top_k, self._component_sources())
+            if components and budget:
+                report = self._token_report(components, user_question)
+                if report["total"] > budget:
+                    fixed = report["components"]["question"] + report["components"]["template"]
+                    components, self.trimmed_sections = trim_components(
+                        components, budget - fixed, self._component_sources())
+            self._context_components[user_question] = components
+            if components and delta_enabled():
+                components = self._apply_delta(components)
+            self._prompt_components[user_question] = components
+        return self._prompt_components[user_question]
+
+    def _apply_delta(self, components):
+        """Replace bodies already emitted in this step; the new record is saved by record_prompt()"""
+        from delta_prompts import record_path, load_record, apply_delta
+        path = record_path(self.state_manager.cache_dir, self.state_manager.session_id or self.state["problem_id"])
+        context_info, _ = self.context_usage()
+        components, record, self.reused_components = apply_delta(
+            components, load_record(path), self.state["current_step"], self.state["current_phase"],
+            context_info['percentage'] if context_info else None)
+        self._delta_record = (path, record)
+        return components
+
+    def record_prompt(self):
+        """Remember the components emitted by the composed prompt (delta mode only)"""
+        if self._delta_record:
+            from delta_prompts import save_record
+            save_record(*self._delta_record)
+            self._delta_record = None
+
+    def _component_sources(self):
+        """{component: path of its source file} for the current step/phase"""
+        key = (self.state["current_step"], self.state["current_phase"])
+        return {name: f"{self.state_manager.components_dir.name}/{filename}"
+                for name, filename in self.state_manager.input_component_files[key].items()}
+
+    def prompt_tokens(self, user_question):
+        """Per-component token report of the prompt for user_question, counted once (None without a session)"""
+        if not self.components or not self.state:
+            return None
+        if user_question not in self._prompt_tokens:
+            self._prompt_tokens[user_question] = self._token_report(self.prompt_components(user_question), user_question)
+        return self._prompt_tokens[user_question]
+
+    def context_tokens(self, user_question):
+        """
+        Token report for the estimated context use of the prompt for user_question -
+        bodies that delta mode replaced by a reference still count in full,
+        since they are already in the context (None without a session)
+        """
+        if not self.components or not self.state:
+            return None
+        components = self.prompt_components(user_question)
+        if self._context_components[user_question] is components:
+            return self.prompt_tokens(user_question)
+        if user_question not in self._context_tokens:
+            self._context_tokens[user_question] = self._token_report(
+                self._context_components[user_question], user_question)
+        return self._context_tokens[user_question]
+
+    def _token_report(self, components, user_question):
+        from token_count import TokenCounter, prompt_token_report
+        from compose_input import prompt_overhead
+        return prompt_token_report(TokenCounter(self.state_manager.cache_dir), components, user_question,
+                                   prompt_overhead(components))
+
+    def advance(self):
+        """Advance step/phase using the already loaded state (updated in place)"""
+        return self.state_manager.advance_step_phase(self.state)
+
+
+def check_io_budgets():
+    """Measure every hook against IO_BUDGETS - returns True when all are within budget"""
+    # The accounting patches os.stat and adds an audit hook, so it lives with the tests
+    from tests.io_accounting import measure_hook_io
+    within_budget = True
+    for hook, budget in IO_BUDGETS.items():
+        counts = measure_hook_io(hook)
+        over = {name: counts[name] for name in budget if counts[name] > budget[name]}
+        status = "✅" if not over else "❌"
+        print(f"{status} {hook}: reads={counts['reads']}/{budget['reads']} "
+              f"writes={counts['writes']}/{budget['writes']} stats={counts['stats']}/{budget['stats']}")
+        within_budget = within_budget and not over
+    return within_budget
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != "check-budget":
+        print("Usage: python session_context.py check-budget")
+        return
+    if not check_io_budgets():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Session Journal - Append-only event log per problem
+Every transition (start, advance, phase, preferences, complete) is one JSON
+line in active/{problem_id}/events.jsonl. STATE.md is a view of the
+journal, re-rendered only when it is older than the journal, and replay
+rebuilds the framework state from the events alone
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+from pathlib import Path
+
+JOURNAL_FILE = "events.jsonl"
+STATE_MD_FILE = "STATE.md"
+
+# Fields a start event copies into the replayed state
+START_FIELDS = ("problem_id", "problem_description", "problem_dir", "session_id", "cwd")
+
+
+def journal_path(problem_dir):
+    return Path(problem_dir) / JOURNAL_FILE
+
+
+def append_record(problem_dir, record):
+    """Append one event record - a single O_APPEND write, so concurrent appends never interleave"""
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+    fd = os.open(journal_path(problem_dir), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+    return record
+
+
+def append_event(problem_dir, event, /, **fields):
+    return append_record(problem_dir, {"ts": datetime.now().isoformat(), "event": event, **fields})
+
+
+def read_events(problem_dir):
+    """Journal events in order (a torn trailing line from a crash is skipped)"""
+    events = []
+    try:
+        with open(journal_path(problem_dir), 'r') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def start_event_from_state(state):
+    """Start event for a problem that predates the journal"""
+    return {"ts": state.get("started", datetime.now().isoformat()), "event": "start",
+            **{field: state.get(field) for field in START_FIELDS},
+            "step": "1", "phase": 1, "synthesized": True}
+
+
+def replay(events):
+    """Framework state rebuilt from journal events (None without a start event)"""
+    state = None
+    for event in events:
+        if event["event"] == "start":
+            state = {field: event.get(field) for field in START_FIELDS}
+            state.update({"current_step": event["step"], "current_phase": event["phase"],
+                          "started": event["ts"], "status": "ACTIVE"})
+        elif state is None:
+            continue
+        elif event["event"] == "complete":
+            state["status"] = "COMPLETE"
+            state["completed"] = event["ts"]
+        if state is not None and "step" in event:
+            state["current_step"], state["current_phase"] = event["step"], event["phase"]
+    return state
+
+
+def _format_time(ts, fmt):
+    return datetime.fromisoformat(ts).strftime(fmt)
+
+
+def _log_line(event, steps):
+    """Session Log entry for one event"""
+    kind = event["event"]
+    if kind == "start":
+        return f"User: Started six-step framework for: {event.get('problem_description')}"
+    if kind in ("advance", "phase"):
+        return f"Advanced to Step {event['step']}, Phase {event['phase']}: {event['step']} - {steps[event['step']]['name']}"
+    if kind == "preferences":
+        archived = f", {event['evicted']} archived" if event.get("evicted") else ""
+        return f"Preferences updated: {event['source']} (+{event['added']}{archived})"
+    if kind == "complete":
+        return "Completed six-step framework ✅"
+    return f"{kind.capitalize()}: Step {event.get('step')}, Phase {event.get('phase')}"
+
+
+def render_state_md(events, steps):
+    """STATE.md markdown for a problem's journal"""
+    state = replay(events)
+    if state is None:
+        return None
+    complete = state["status"] == "COMPLETE"
+    step = state["current_step"]
+
+    lines = [f"# Problem: {state['problem_description']}",
+             f"**Status**: {'COMPLETE ✅' if complete else 'ACTIVE'}",
+             f"**Current Step**: {step} - {steps[step]['name']}",
+             f"**Current Phase**: Phase {state['current_phase']}",
+             f"**Started**: {_format_time(state['started'], '%Y-%m-%d %H:%M')}"]
+    if complete:
+        lines.append(f"**Completed**: {_format_time(state['completed'], '%Y-%m-%d %H:%M')}")
+
+    lines += ["", "## Progress Overview"]
+    for number, info in steps.items():
+        done = complete or int(number) < int(step)
+        lines.append(f"- [{'x' if done else ' '}] Step {number}: {info['name']}")
+
+    lines += ["", "## Session Log"]
+    for event in events:
+        lines.append(f"- {_format_time(event['ts'], '%H:%M')} {_log_line(event, steps)}")
+    return "\n".join(lines) + "\n"
+
+
+def ensure_state_md(problem_dir, steps):
+    """Re-render STATE.md when the journal changed since it was last rendered - returns its path"""
+    state_md = Path(problem_dir) / STATE_MD_FILE
+    try:
+        journal_mtime = os.stat(journal_path(problem_dir)).st_mtime_ns
+    except FileNotFoundError:
+        return state_md  # Problem predates the journal - keep its hand-maintained STATE.md
+    try:
+        if os.stat(state_md).st_mtime_ns > journal_mtime:
+            return state_md
+    except FileNotFoundError:
+        pass
+
+    # A concurrent render of an older journal may replace ours - render again
+    # until the journal is unchanged after our replace
+    while True:
+        journal_stat = os.stat(journal_path(problem_dir))
+        content = render_state_md(read_events(problem_dir), steps)
+        if content is None:
+            return state_md
+        tmp_path = state_md.with_name(f"{state_md.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, state_md)
+        after = os.stat(journal_path(problem_dir))
+        if (after.st_size, after.st_mtime_ns) == (journal_stat.st_size, journal_stat.st_mtime_ns):
+            return state_md
+
+
+def find_problem_dir(state_manager, problem_id):
+    """active/{problem_id} or the newest completed/{problem_id}* directory"""
+    active = state_manager.active_dir / problem_id
+    if active.is_dir():
+        return active
+    completed = sorted(state_manager.completed_dir.glob(f"{problem_id}*"), key=lambda p: p.stat().st_mtime)
+    return completed[-1] if completed else None
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("show", "render", "replay"):
+        print("Usage: python session_journal.py show|render [problem_id]")
+        print("       python session_journal.py replay [problem_id] [--write]")
+        return
+
+    from framework_state import FrameworkState
+
+    state_manager = FrameworkState(fast_path=True)
+    args = [arg for arg in sys.argv[2:] if arg != "--write"]
+    current_state = state_manager.load_current_state()
+    problem_id = args[0] if args else (current_state or {}).get("problem_id")
+    problem_dir = find_problem_dir(state_manager, problem_id) if problem_id else None
+    if problem_dir is None:
+        print("❌ No active six-step session found (pass a problem_id)")
+        return
+
+    events = read_events(problem_dir)
+    if not events:
+        print(f"❌ No journal in {problem_dir}")
+        return
+    command = sys.argv[1]
+
+    if command == "show":
+        for event in events:
+            details = {k: v for k, v in event.items() if k not in ("ts", "event")}
+            print(f"{event['ts']} {event['event']:<12} {json.dumps(details, ensure_ascii=False)}")
+    elif command == "render":
+        print(f"📝 {ensure_state_md(problem_dir, state_manager.steps)}")
+    else:
+        state = replay(events)
+        print(json.dumps(state, indent=2, ensure_ascii=False))
+        if "--write" not in sys.argv:
+            return
+        if state is None or state["status"] != "ACTIVE":
+            print("❌ Only an active problem's state can be written back")
+            return
+        if current_state and current_state["problem_id"] != state["problem_id"]:
+            print(f"❌ The current session runs {current_state['problem_id']}, not {state['problem_id']}")
+            return
+        with state_manager.state_lock():
+            saved = state_manager.load_current_state() or {}
+            state["version"] = saved.get("version", 0)
+            state_manager._write_state(state)
+        print(f"💾 Rebuilt state written to {state_manager.state_file}")
+
+
+if __name__ == "__main__":
+    main()
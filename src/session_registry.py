@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Session Registry - Several six-step problems running side by side
+Each session keeps its state in sessions/{session_id}.json and the
+registry (sessions/registry.json) maps working directories to session ids,
+so the active session of a worktree is found with a dictionary lookup.
+SIXSTEP_SESSION selects a session explicitly
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+
+REGISTRY_FILE = "registry.json"
+REGISTRY_VERSION = 1
+SESSION_ENV = "SIXSTEP_SESSION"
+
+
+def registry_path(sessions_dir):
+    return Path(sessions_dir) / REGISTRY_FILE
+
+
+def session_state_file(sessions_dir, session_id):
+    """Per-session state file (same format current_state.json used)"""
+    return Path(sessions_dir) / f"{session_id}.json"
+
+
+def normalize_cwd(cwd=None):
+    """Registry key for a working directory"""
+    return str(Path(cwd or os.getcwd()).resolve())
+
+
+def empty_registry():
+    return {"version": REGISTRY_VERSION, "sessions": {}, "by_cwd": {}}
+
+
+def load_registry(sessions_dir):
+    """{"sessions": {id: {problem_id, cwd, registered}}, "by_cwd": {cwd: id}}"""
+    try:
+        with open(registry_path(sessions_dir), 'r') as f:
+            registry = json.load(f)
+        if registry.get("version") == REGISTRY_VERSION:
+            return registry
+    except (OSError, ValueError):
+        pass
+    return empty_registry()
+
+
+def save_registry(sessions_dir, registry):
+    """Atomically replace the registry"""
+    path = registry_path(sessions_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def resolve_session(registry, session_id=None, cwd=None, use_env=True):
+    """
+    Session id for an explicit id (argument, or SIXSTEP_SESSION unless use_env
+    is False), else for the working directory or its nearest registered
+    parent; None when unbound
+    """
+    if use_env:
+        session_id = session_id or os.environ.get(SESSION_ENV)
+    if session_id:
+        return session_id if session_id in registry["sessions"] else None
+    by_cwd = registry["by_cwd"]
+    path = Path(normalize_cwd(cwd))
+    for candidate in (path, *path.parents):
+        session_id = by_cwd.get(str(candidate))
+        if session_id in registry["sessions"]:
+            return session_id
+    return None
+
+
+def register_session(registry, problem_id, cwd, taken=()):
+    """Add a session for problem_id bound to cwd and return its id - unique among sessions and taken ids"""
+    from datetime import datetime
+
+    session_id = problem_id
+    suffix = 2
+    while session_id in registry["sessions"] or session_id in taken:
+        session_id = f"{problem_id}_{suffix}"
+        suffix += 1
+    cwd = normalize_cwd(cwd)
+    registry["sessions"][session_id] = {"problem_id": problem_id, "cwd": cwd,
+                                        "registered": datetime.now().isoformat()}
+    registry["by_cwd"][cwd] = session_id
+    return session_id
+
+
+def unregister_session(registry, session_id):
+    """Remove a session and every working-directory binding to it"""
+    session = registry["sessions"].pop(session_id, None)
+    for cwd in [cwd for cwd, bound in registry["by_cwd"].items() if bound == session_id]:
+        del registry["by_cwd"][cwd]
+    return session
+
+
+def bind_cwd(registry, session_id, cwd):
+    """Make session_id the active session of a working directory"""
+    registry["by_cwd"][normalize_cwd(cwd)] = session_id
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("list", "which", "use"):
+        print("Usage: python session_registry.py list|which")
+        print("       python session_registry.py use SESSION_ID")
+        return
+
+    sessions_dir = Path(__file__).parent / "sessions"
+    registry = load_registry(sessions_dir)
+    command = sys.argv[1]
+
+    if command == "list":
+        if not registry["sessions"]:
+            print("❌ No registered six-step sessions")
+        for session_id, session in sorted(registry["sessions"].items()):
+            active = "👉" if registry["by_cwd"].get(session["cwd"]) == session_id else "  "
+            print(f"{active} {session_id} ({session['cwd']}, registered {session['registered']})")
+    elif command == "which":
+        session_id = resolve_session(registry)
+        print(f"📍 {session_id}" if session_id else f"❌ No session for {normalize_cwd()}")
+    else:
+        if len(sys.argv) < 3 or sys.argv[2] not in registry["sessions"]:
+            print("❌ Unknown session - see `python session_registry.py list`")
+            return
+        from meta_log import locked
+        with locked(registry_path(sessions_dir)):
+            registry = load_registry(sessions_dir)
+            bind_cwd(registry, sys.argv[2], None)
+            save_registry(sessions_dir, registry)
+        print(f"✅ {normalize_cwd()} now uses session {sys.argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Cold-start budget for the hook entry points
+Runs compose_input.py as a fresh process in a throwaway framework tree,
+prints an `-X importtime` breakdown and fails when the median cold start
+exceeds the budget
+"""
+
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+COLD_START_BUDGET_MS = 120
+
+
+def make_benchmark_tree(tmp_root):
+    """Copy scripts and input components into tmp_root and start a problem there"""
+    tmp_root = Path(tmp_root)
+    for script in SCRIPT_DIR.glob("*.py"):
+        shutil.copy2(script, tmp_root / script.name)
+    shutil.copytree(SCRIPT_DIR / "input_components", tmp_root / "input_components")
+
+    subprocess.run([sys.executable, "framework_state.py", "start", "Startup benchmark"],
+                   cwd=tmp_root, capture_output=True, check=True)
+    # Seed a fresh context probe so no background refresher is spawned
+    subprocess.run([sys.executable, "-c",
+                    "from context_usage import write_cached_usage; write_cached_usage(None, 'benchmark')"],
+                   cwd=tmp_root, check=True)
+    return tmp_root
+
+
+def run_hook(tmp_root, extra_args=()):
+    """Run compose_input.py once and return (elapsed_ms, stderr)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *extra_args, "compose_input.py", "benchmark question"],
+                            cwd=tmp_root, capture_output=True, text=True)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"compose_input.py failed: {result.stderr.strip()}")
+    return elapsed_ms, result.stderr
+
+
+def import_breakdown(importtime_output, top=15):
+    """Parse `-X importtime` output into (cumulative_us, self_us, module) sorted by cumulative"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def _time_interpreter():
+    """Wall-clock time of a bare `python -c pass` in ms"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start benchmark for compose_input.py')
+    parser.add_argument('--runs', type=int, default=10, help='Number of cold starts to time')
+    parser.add_argument('--budget-ms', type=float, default=COLD_START_BUDGET_MS, help='Median cold-start budget')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_root:
+        make_benchmark_tree(tmp_root)
+        # Warm-up builds bundles and the layout stamp, as on any machine after the first prompt
+        run_hook(tmp_root)
+
+        baseline_ms = sorted(_time_interpreter() for _ in range(3))[1]
+
+        _, importtime_output = run_hook(tmp_root, ("-X", "importtime"))
+        print("📦 Import breakdown (cumulative µs | self µs | module):")
+        for cumulative_us, self_us, module in import_breakdown(importtime_output):
+            print(f"   {cumulative_us:>8} | {self_us:>8} | {module}")
+
+        samples = sorted(run_hook(tmp_root)[0] for _ in range(args.runs))
+        median_ms = samples[len(samples) // 2]
+
+    print()
+    print(f"⏱️  Bare interpreter start: {baseline_ms:.1f} ms")
+    print(f"⏱️  compose_input.py cold start: median {median_ms:.1f} ms, "
+          f"min {samples[0]:.1f} ms, max {samples[-1]:.1f} ms ({args.runs} runs)")
+
+    if median_ms > args.budget_ms:
+        print(f"❌ Cold start over budget: {median_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        sys.exit(1)
+    print(f"✅ Cold start within budget ({args.budget_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+State Stress Check - Concurrent advance/compose against one session
+Starts a problem in a throwaway framework tree, then runs many worker
+processes that advance, rewind, bump a counter through optimistic saves
+and compose prompts at the same time. Fails when any compose saw no
+session, a save was lost, or the journal or STATE.md disagrees with the
+saved state
+"""
+
+import sys
+import json
+import random
+import argparse
+import tempfile
+import subprocess
+
+from startup_benchmark import make_benchmark_tree
+
+STATE_RETRIES = 50
+
+
+def advance_or_rewind(state_manager):
+    """Advance one step/phase; at step 6 rewind to step 1 instead of completing the session"""
+    with state_manager.state_lock():
+        state = state_manager.load_current_state()
+        if state["current_step"] != "6":
+            state_manager.advance_step_phase()
+            return "advance"
+        state["current_step"], state["current_phase"] = "1", 1
+        state_manager.save_state(state)
+        state_manager.record_event(state, "rewind", step="1", phase=1)
+        return "rewind"
+
+
+def bump_counter(state_manager):
+    """Optimistic read-modify-write outside the lock - retried on StateConflictError"""
+    from framework_state import StateConflictError
+
+    for attempt in range(STATE_RETRIES):
+        state = state_manager.load_current_state()
+        state["stress_counter"] = state.get("stress_counter", 0) + 1
+        try:
+            state_manager.save_state(state)
+            return attempt
+        except StateConflictError:
+            continue
+    raise RuntimeError(f"Counter save still conflicting after {STATE_RETRIES} attempts")
+
+
+def run_worker(rounds, seed):
+    """One worker process - prints its operation counts as JSON"""
+    from framework_state import FrameworkState
+    from session_context import SessionContext
+    from compose_input import build_hook_output
+
+    rng = random.Random(seed)
+    counts = {"advance": 0, "rewind": 0, "counter": 0, "conflicts": 0, "compose": 0, "lost": 0}
+    for round_number in range(rounds):
+        state_manager = FrameworkState(fast_path=True)
+        operation = rng.choice(("step", "counter", "compose", "compose"))
+        if operation == "step":
+            counts[advance_or_rewind(state_manager)] += 1
+        elif operation == "counter":
+            counts["conflicts"] += bump_counter(state_manager)
+            counts["counter"] += 1
+        else:
+            session = SessionContext(state_manager)
+            output = build_hook_output(f"stress question {seed}.{round_number}", session)
+            counts["compose"] += 1
+            if not session.state or "[USER QUESTION]" not in output:
+                counts["lost"] += 1
+    print(json.dumps(counts))
+
+
+def check_tree(tmp_root, totals):
+    """Problems found in the final state of the stress tree"""
+    from framework_state import FrameworkState
+    from session_journal import read_events, replay, ensure_state_md
+
+    state_manager = FrameworkState(root=tmp_root, fast_path=True, cwd=tmp_root)
+    state = state_manager.load_current_state()
+    if not state:
+        return ["state file missing or unreadable after the run"]
+
+    problems = []
+    if totals["lost"]:
+        problems.append(f"{totals['lost']} compose runs found no active session")
+    if state.get("stress_counter", 0) != totals["counter"]:
+        problems.append(f"counter is {state.get('stress_counter', 0)}, expected {totals['counter']} (lost updates)")
+    # Every save bumps the version once: start + advances + rewinds + counter saves
+    expected_version = 1 + totals["advance"] + totals["rewind"] + totals["counter"]
+    if state.get("version") != expected_version:
+        problems.append(f"state version is {state.get('version')}, expected {expected_version}")
+
+    # The journal must replay to the saved state, with one event per transition
+    events = read_events(state["problem_dir"])
+    replayed = replay(events)
+    if (replayed["current_step"], replayed["current_phase"]) != (state["current_step"], state["current_phase"]):
+        problems.append("journal replay disagrees with the saved step/phase")
+    transitions = sum(1 for event in events if event["event"] in ("advance", "phase", "rewind"))
+    if transitions != totals["advance"] + totals["rewind"]:
+        problems.append(f"journal has {transitions} transitions, expected {totals['advance'] + totals['rewind']}")
+
+    state_md = ensure_state_md(state["problem_dir"], state_manager.steps).read_text()
+    step_line = f"**Current Step**: {state['current_step']} - {state_manager.steps[state['current_step']]['name']}"
+    if step_line not in state_md or f"**Current Phase**: Phase {state['current_phase']}" not in state_md:
+        problems.append("STATE.md does not match the saved step/phase")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent advance/compose stress check for framework state')
+    parser.add_argument('--processes', type=int, default=12, help='Concurrent worker processes')
+    parser.add_argument('--rounds', type=int, default=25, help='Operations per worker')
+    parser.add_argument('--worker', type=int, metavar='SEED', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(args.rounds, args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_root:
+        make_benchmark_tree(tmp_root)
+        workers = [subprocess.Popen([sys.executable, "state_stress.py", "--worker", str(seed), "--rounds", str(args.rounds)],
+                                    cwd=tmp_root, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                   for seed in range(args.processes)]
+
+        totals = {}
+        failed = 0
+        for worker in workers:
+            stdout, stderr = worker.communicate()
+            if worker.returncode != 0:
+                failed += 1
+                print(f"❌ Worker failed: {stderr.strip().splitlines()[-1] if stderr.strip() else worker.returncode}")
+                continue
+            for key, value in json.loads(stdout.strip().splitlines()[-1]).items():
+                totals[key] = totals.get(key, 0) + value
+
+        problems = check_tree(tmp_root, totals) if totals else ["no worker finished"]
+        if failed:
+            problems.append(f"{failed} of {args.processes} workers failed")
+
+    print(f"🔨 {args.processes} processes x {args.rounds} rounds: {totals.get('advance', 0)} advances, "
+          f"{totals.get('rewind', 0)} rewinds, {totals.get('counter', 0)} counter saves "
+          f"({totals.get('conflicts', 0)} version conflicts retried), {totals.get('compose', 0)} composes")
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        sys.exit(1)
+    print("✅ No state lost under concurrent writes")
+
+
+if __name__ == "__main__":
+    main()
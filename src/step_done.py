@@ -4,103 +4,139 @@ Enhanced step-done: Advance framework + Extract user preferences
 Works like compose_input.py - composes input components and outputs enhanced prompt
 """
 
+import hook_profiler  # First import - profiled runs time the imports below
 import sys
 from pathlib import Path
 from framework_state import FrameworkState
-
-
-def main():
-    """Main entry point - advance state then compose preference extraction prompt"""
-    try:
-        state_manager = FrameworkState()
-
-        # IMPORTANT: Save current step/phase info BEFORE advancing
-        # This ensures we extract preferences from the correct (completed) step
-        pre_advance_state = state_manager.load_current_state()
-        if not pre_advance_state:
-            print("❌ No active six-step session found")
-            return
-
-        completed_step = pre_advance_state["current_step"]
-        completed_phase = pre_advance_state.get("current_phase", 1)
-        problem_id = pre_advance_state["problem_id"]
-
-        # Now advance the framework state (original step-done behavior)
-        print("🚀 Advancing framework step/phase...")
-        result = state_manager.advance_step_phase()
-        print(result)
-
-        # Check if advancement was successful
-        if "❌" in result or "No active" in result or "Framework complete" in result:
-            return
-
-        print("\n🔍 Extracting user preferences from completed step...")
-        print("=" * 60)
-
-        # Load current state for framework info (after advancement)
-        current_state = state_manager.load_current_state()
-        if not current_state:
-            print("❌ Could not load current state for preference extraction")
-            return
-        
-        # Get step-done input components
-        step_done_components = state_manager.input_component_files.get(("step-done", 1), {})
-        
-        if not step_done_components:
-            print("❌ Step-done input components not found")
-            return
-        
-        # Load each component
-        components = {}
-        for component_type, filename in step_done_components.items():
-            file_path = state_manager.components_dir / filename
-            if file_path.exists():
-                with open(file_path, 'r') as f:
-                    components[component_type] = f.read().strip()
-            else:
-                components[component_type] = f"❌ Missing file: {filename}"
-        
-        # Use COMPLETED step info for preference extraction (pre-advancement values)
-        # This ensures we compare meta files from completed step with input components from same step
-
-        # Determine step-specific paths using COMPLETED step info
-        if completed_step == "3":
-            if completed_phase == 1:
-                current_step_info_path = f"input_components/step3/phase1_step_info.md"
-                meta_file_path = f"meta/{problem_id}/step3.md"
-            else:  # phase 2
-                current_step_info_path = f"input_components/step3/phase2_step_info.md"
-                meta_file_path = f"meta/{problem_id}/step3_phase2.md"
-        else:
-            current_step_info_path = f"input_components/step{completed_step}/step_info.md"
-            meta_file_path = f"meta/{problem_id}/step{completed_step}.md"
-        
-        # Compose and output the enhanced prompt (like compose_input.py)
-        enhanced_prompt = f"""[SIX-STEP FRAMEWORK ACTIVE]
-
-🏗️  FRAMEWORK INFO: {components.get('framework_info', 'Missing framework info')}
-
-📍 CURRENT TASK: Extract user preferences from completed step and add them to step_info file
-
-🎯 STEP INFO: {components.get('step_info', 'Missing step info')}
-
-📚 DATA SOURCES: {components.get('data_sources', 'Missing data sources')}
-
-📋 OUTPUT REQUIREMENTS: {components.get('output_requirements', 'Missing output requirements')}
-
-🔍 CONTEXT:
+from session_context import SessionContext
+from prompt_blobs import expanded_view
+from preference_digest import digest_view
+from meta_log import load_index
+from meta_spool import drain
+from extraction_watermark import next_extraction_range, record_watermark, preferences_hash
+from prompt_layout import FRAMEWORK, STEP, PROBLEM, INTERACTION, FRAMEWORK_INSTRUCTION, render_prompt
+
+
+def run_step_done(session):
+    """Advance state then compose the preference extraction prompt for a loaded session"""
+    state_manager = session.state_manager
+
+    # IMPORTANT: Save current step/phase info BEFORE advancing
+    # This ensures we extract preferences from the correct (completed) step
+    pre_advance_state = session.state
+    if not pre_advance_state:
+        print("❌ No active six-step session found")
+        return
+
+    completed_step = pre_advance_state["current_step"]
+    completed_phase = pre_advance_state.get("current_phase", 1)
+    problem_id = pre_advance_state["problem_id"]
+
+    # Now advance the framework state (original step-done behavior)
+    # The session state is updated in place, so no reload is needed afterwards
+    print("🚀 Advancing framework step/phase...")
+    result = session.advance()
+    print(result)
+
+    # Check if advancement was successful
+    if "❌" in result or "No active" in result or "Framework complete" in result:
+        return
+
+    print("\n🔍 Extracting user preferences from completed step...")
+    print("=" * 60)
+
+    # Completing step 6 clears the session state
+    if "Framework session completed" in result:
+        print("❌ Could not load current state for preference extraction")
+        return
+    
+    # Get step-done input components
+    if ("step-done", 1) not in state_manager.input_component_files:
+        print("❌ Step-done input components not found")
+        return
+    
+    # Load all components from the compiled step-done bundle
+    components = session.load_components(("step-done", 1))
+    
+    # Use COMPLETED step info for preference extraction (pre-advancement values)
+    # This ensures we compare meta files from completed step with input components from same step
+
+    # Determine step-specific paths using COMPLETED step info
+    if completed_step == "3":
+        if completed_phase == 1:
+            current_step_info_path = f"input_components/step3/phase1_step_info.md"
+            meta_file_name = "step3.md"
+        else:  # phase 2
+            current_step_info_path = f"input_components/step3/phase2_step_info.md"
+            meta_file_name = "step3_phase2.md"
+    else:
+        current_step_info_path = f"input_components/step{completed_step}/step_info.md"
+        meta_file_name = f"step{completed_step}.md"
+    meta_file_path = f"meta/{problem_id}/{meta_file_name}"
+    meta_file = state_manager.meta_dir / problem_id / meta_file_name
+    step_info_source = current_step_info_path[len("input_components/"):]
+
+    # Only hand over interactions logged since the last extraction pass (spooled entries included)
+    drain(state_manager.cache_dir)
+    total_interactions = load_index(meta_file)["count"]
+    # The previous pass counts as done only if it changed the step's preferences
+    prefs_hash = preferences_hash(state_manager.components_dir, step_info_source)
+    first_interaction, last_interaction, watermark = next_extraction_range(meta_file, total_interactions, prefs_hash)
+    if watermark and first_interaction > last_interaction:
+        print(f"✅ No new interactions in {meta_file_name} since the last extraction "
+              f"(analyzed through interaction {watermark['last_interaction']})")
+        return
+    
+    # Meta logs store components by reference - hand the model the expanded markdown
+    expanded_file = expanded_view(meta_file, state_manager.meta_dir, first_interaction)
+    digest_line = ""
+    if expanded_file:
+        meta_file_path = f"meta/{problem_id}/expanded/{expanded_file.name}"
+        # Point extraction at the local digest first; the full log stays available
+        digest_file, raw_bytes, digest_bytes = digest_view(expanded_file)
+        digest_line = (f"- Preference Digest (read first): meta/{problem_id}/digest/{digest_file.name} "
+                       f"({digest_bytes:,} bytes, {raw_bytes - digest_bytes:,} of {raw_bytes:,} raw bytes removed)\n")
+
+    if first_interaction > 1:
+        interaction_range = (f"{first_interaction}-{last_interaction} "
+                             f"(1-{first_interaction - 1} already analyzed by an earlier extraction pass)")
+    else:
+        interaction_range = f"1-{last_interaction}" if last_interaction else "none logged"
+    
+    # Compose and output the enhanced prompt with compose_input.py's layout - most stable blocks first
+    enhanced_prompt = render_prompt([
+        (FRAMEWORK, f"🏗️  FRAMEWORK INFO: {components.get('framework_info', 'Missing framework info')}"),
+        (FRAMEWORK, FRAMEWORK_INSTRUCTION),
+        (STEP, "🎯 CURRENT TASK: Extract user preferences from completed step and add them to step_info file"),
+        (STEP, f"📍 CURRENT STEP/PHASE: {components.get('step_info', 'Missing step info')}"),
+        (STEP, f"📚 DATA SOURCES: {components.get('data_sources', 'Missing data sources')}"),
+        (STEP, f"📋 OUTPUT REQUIREMENTS: {components.get('output_requirements', 'Missing output requirements')}"),
+        (PROBLEM, f"""🔍 PROBLEM CONTEXT:
 - Problem ID: {problem_id}
 - Completed Step: {completed_step} (Phase {completed_phase})
 - **FILE TO UPDATE**: {current_step_info_path}
-- Meta File to Analyze: {meta_file_path}
+- **UPDATE COMMAND**: python3 claude_intelligence/solution_map_implementation/update_input_components.py "preference1 | preference2" --step {completed_step}
 - Active Directory: active/{problem_id}/
 
-IMPORTANT: Update preferences in the COMPLETED step's file: {current_step_info_path}
+IMPORTANT: Update preferences for the COMPLETED step's file ({current_step_info_path}) with the UPDATE COMMAND - do not edit its USER PREFERENCES section by hand"""),
+        (INTERACTION, f"""🔎 EXTRACTION PASS:
+{digest_line}- Meta File to Analyze: {meta_file_path}
+- Interactions to Analyze: {interaction_range}
 
-Analyze the conversation from the completed step to extract NEW user working preferences not already captured in the completed step's input components, then automatically add them to the step_info file."""
-        
-        print(enhanced_prompt)
-        
+Analyze the conversation from the completed step to extract NEW user working preferences not already captured in the completed step's input components, then automatically add them to the step_info file."""),
+    ])
+    
+    print(enhanced_prompt)
+    record_watermark(meta_file, watermark, last_interaction, prefs_hash)
+
+
+def main():
+    """Main entry point - advance state then compose preference extraction prompt"""
+    hook_profiler.start("step_done")
+    try:
+        session = SessionContext(FrameworkState(fast_path=True))
+        with hook_profiler.stage("composition"):
+            run_step_done(session)
     except Exception as e:
         print(f"❌ Error in enhanced step-done: {e}")
 
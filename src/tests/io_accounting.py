@@ -0,0 +1,133 @@
+"""
+I/O accounting for the hook budget checks - counts file reads, writes and
+stats under a throwaway framework root. Test-only: enabling it installs an
+audit hook and replaces os.stat for the rest of the process
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from framework_state import FrameworkState  # noqa: E402
+from session_context import SessionContext  # noqa: E402
+
+FRAMEWORK_ROOT = Path(__file__).resolve().parent.parent
+
+
+class IOStats:
+    """Counts file reads, writes and stats under a root directory"""
+
+    def __init__(self, root):
+        self.root = str(Path(root).resolve())
+        self.reads = 0
+        self.writes = 0
+        self.stats = 0
+        self.enabled = False
+
+    def _tracked(self, path):
+        try:
+            return os.path.abspath(os.fsdecode(path)).startswith(self.root)
+        except TypeError:
+            return False  # File descriptors and other non-path arguments
+
+    def audit(self, event, args):
+        """sys.audit hook - classifies open() calls as reads or writes"""
+        if not self.enabled or event != "open" or not self._tracked(args[0]):
+            return
+        mode, flags = args[1], args[2]
+        if mode:
+            is_write = any(c in mode for c in "wax+")
+        else:
+            is_write = bool(flags & (os.O_WRONLY | os.O_RDWR))
+        if is_write:
+            self.writes += 1
+        else:
+            self.reads += 1
+
+    def as_dict(self):
+        return {"reads": self.reads, "writes": self.writes, "stats": self.stats}
+
+
+_active_io_stats = None
+
+
+def enable_io_accounting(root):
+    """Start counting file operations under root for the rest of the process"""
+    global _active_io_stats
+    if _active_io_stats is None:
+        stats = IOStats(root)
+        sys.addaudithook(stats.audit)
+
+        real_stat = os.stat
+
+        def counting_stat(path, *args, **kwargs):
+            if stats.enabled and stats._tracked(path):
+                stats.stats += 1
+            return real_stat(path, *args, **kwargs)
+
+        # os.stat has no audit event - Path.exists()/stat() resolve it at call time
+        os.stat = counting_stat
+        _active_io_stats = stats
+    _active_io_stats.root = str(Path(root).resolve())
+    _active_io_stats.reads = _active_io_stats.writes = _active_io_stats.stats = 0
+    _active_io_stats.enabled = True
+    return _active_io_stats
+
+
+def disable_io_accounting():
+    """Stop counting and return the final counts"""
+    if _active_io_stats is None:
+        return {"reads": 0, "writes": 0, "stats": 0}
+    _active_io_stats.enabled = False
+    return _active_io_stats.as_dict()
+
+
+def make_budget_tree(tmp_root):
+    """Throwaway framework root with a started problem"""
+    import shutil
+    from context_usage import write_cached_usage
+    from component_bundles import compile_all
+    shutil.copytree(FRAMEWORK_ROOT / "input_components", Path(tmp_root) / "input_components")
+    state_manager = FrameworkState(tmp_root)
+    state_manager.start_new_problem("IO budget check")
+    # Seed a fresh context probe so no background refresher is spawned
+    write_cached_usage(None, "IO budget check", state_manager.cache_dir)
+    compile_all(state_manager)
+    return state_manager
+
+
+def measure_hook_io(hook):
+    """Run one warm invocation of a hook in a throwaway tree and return its I/O counts"""
+    import tempfile
+    from contextlib import redirect_stdout
+    from io import StringIO
+    import compose_input
+    import step_done
+    from meta_spool import drain
+
+    with tempfile.TemporaryDirectory() as tmp_root, redirect_stdout(StringIO()):
+        make_budget_tree(tmp_root)
+        # Warm-up runs build bundles, meta directories, the layout stamp and caches
+        # and leave the previous prompt's entry in the spool, as between two prompts
+        for question in ("warm-up question", "previous question"):
+            warm_up = SessionContext(FrameworkState(tmp_root, fast_path=True))
+            drain(warm_up.state_manager.cache_dir)
+            compose_input.build_hook_output(question, warm_up)
+        if hook != "compose":
+            # Each spooled entry's append is counted once, in the compose measurement
+            drain(warm_up.state_manager.cache_dir)
+
+        enable_io_accounting(tmp_root)
+        try:
+            if hook == "compose":
+                # As compose_input.main(): drain the earlier entry, then compose and spool
+                session = SessionContext(FrameworkState(tmp_root, fast_path=True))
+                drain(session.state_manager.cache_dir)
+                compose_input.build_hook_output("budget question", session)
+            else:
+                step_done.run_step_done(SessionContext(FrameworkState(tmp_root, fast_path=True)))
+        finally:
+            counts = disable_io_accounting()
+    return counts
@@ -0,0 +1,37 @@
+"""
+A preference update rebuilds only the bundles that render that step's preferences
+"""
+
+import sys
+from io import StringIO
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from component_bundles import bundle_sources, load_bundle, recompile_for_file  # noqa: E402
+from preference_store import store_path, load_store, save_store, step_preferences, set_step_preferences  # noqa: E402
+from tests.io_accounting import make_budget_tree  # noqa: E402
+
+
+def test_preference_update_rebuilds_only_its_step(tmp_path):
+    with redirect_stdout(StringIO()):
+        state_manager = make_budget_tree(tmp_path)
+
+    source = state_manager.input_component_files[("4", 1)]["step_info"]
+    store = load_store(state_manager.components_dir)
+    set_step_preferences(store, source, (step_preferences(store, source) or []) + ["Keep summaries short"])
+    save_store(state_manager.components_dir, store)
+
+    assert recompile_for_file(state_manager, store_path(state_manager.components_dir)) == [("4", 1)]
+    assert "Keep summaries short" in load_bundle(state_manager, ("4", 1))["step_info"]
+    assert "Keep summaries short" not in load_bundle(state_manager, ("2", 1))["step_info"]
+
+
+def test_store_is_a_source_only_of_step_info_keys(tmp_path):
+    with redirect_stdout(StringIO()):
+        state_manager = make_budget_tree(tmp_path)
+
+    for key, files in state_manager.input_component_files.items():
+        has_store = any(kind == "user_preferences" for kind, _ in bundle_sources(state_manager, key))
+        assert has_store == ("step_info" in files)
@@ -0,0 +1,35 @@
+"""
+The estimated context use counts component bodies that delta mode replaced
+"""
+
+import sys
+import tempfile
+from io import StringIO
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from framework_state import FrameworkState  # noqa: E402
+from session_context import SessionContext  # noqa: E402
+from tests.io_accounting import make_budget_tree  # noqa: E402
+
+
+def test_delta_references_do_not_lower_the_context_estimate(monkeypatch):
+    import compose_input
+
+    monkeypatch.setenv("SIXSTEP_DELTA_PROMPTS", "1")
+    with tempfile.TemporaryDirectory() as tmp_root, redirect_stdout(StringIO()):
+        make_budget_tree(tmp_root)
+        first = SessionContext(FrameworkState(tmp_root, fast_path=True))
+        compose_input.build_hook_output("first question", first)
+
+        second = SessionContext(FrameworkState(tmp_root, fast_path=True))
+        output = compose_input.build_hook_output("second question", second)
+
+    assert second.reused_components
+    assert second.prompt_tokens("second question")["total"] < second.context_tokens("second question")["total"]
+    assert second.context_tokens("second question")["total"] == first.context_tokens("first question")["total"] \
+        - first.prompt_tokens("first question")["components"]["question"] \
+        + second.prompt_tokens("second question")["components"]["question"]
+    assert f"~{second.context_tokens('second question')['total']:,}/" in output
@@ -0,0 +1,35 @@
+"""
+Extraction watermarks only move past a pass once it changed the step's preferences
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extraction_watermark import next_extraction_range, record_watermark  # noqa: E402
+
+
+def test_unconfirmed_pass_is_offered_again(tmp_path):
+    meta_file = tmp_path / "step1.md"
+    first, last, watermark = next_extraction_range(meta_file, 4, "prefs-a")
+    assert (first, last, watermark) == (1, 4, None)
+    record_watermark(meta_file, watermark, last, "prefs-a")
+
+    # The extraction turn was aborted - the preferences did not change
+    first, last, watermark = next_extraction_range(meta_file, 6, "prefs-a")
+    assert (first, last, watermark) == (1, 6, None)
+
+
+def test_pass_confirmed_by_preference_change(tmp_path):
+    meta_file = tmp_path / "step1.md"
+    record_watermark(meta_file, None, 4, "prefs-a")
+
+    first, last, watermark = next_extraction_range(meta_file, 6, "prefs-b")
+    assert (first, last) == (5, 6)
+    assert watermark["last_interaction"] == 4
+    record_watermark(meta_file, watermark, last, "prefs-b")
+
+    # The second pass found nothing new - only interactions 5-6 come back
+    first, last, watermark = next_extraction_range(meta_file, 7, "prefs-b")
+    assert (first, last, watermark["last_interaction"]) == (5, 7, 4)
@@ -0,0 +1,50 @@
+"""
+I/O budget and single-load checks for the hook entry points
+Runs the same measurement as `python session_context.py check-budget`
+"""
+
+import sys
+import tempfile
+from io import StringIO
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from framework_state import FrameworkState  # noqa: E402
+from session_context import IO_BUDGETS, SessionContext  # noqa: E402
+from tests.io_accounting import measure_hook_io, make_budget_tree  # noqa: E402
+
+
+@pytest.mark.parametrize("hook", sorted(IO_BUDGETS))
+def test_hook_io_within_budget(hook):
+    counts = measure_hook_io(hook)
+    budget = IO_BUDGETS[hook]
+    over = {name: f"{counts[name]} > {budget[name]}" for name in budget if counts[name] > budget[name]}
+    assert not over, f"{hook} over its I/O budget: {over}"
+
+
+def test_compose_loads_state_and_components_once(monkeypatch):
+    import compose_input
+
+    calls = {"load_current_state": 0, "load_components": 0}
+
+    def counting(name):
+        original = getattr(FrameworkState, name)
+
+        def wrapper(self, *args, **kwargs):
+            calls[name] += 1
+            return original(self, *args, **kwargs)
+        return wrapper
+
+    with tempfile.TemporaryDirectory() as tmp_root, redirect_stdout(StringIO()):
+        make_budget_tree(tmp_root)
+        for name in calls:
+            monkeypatch.setattr(FrameworkState, name, counting(name))
+        session = SessionContext(FrameworkState(tmp_root, fast_path=True))
+        output = compose_input.build_hook_output("single load question", session)
+
+    assert "single load question" in output
+    assert calls == {"load_current_state": 1, "load_components": 1}
@@ -0,0 +1,44 @@
+"""
+The meta log sidecar stays fixed-size; older interactions are found by scanning
+"""
+
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from meta_log import append_interaction, index_path, load_index  # noqa: E402
+from meta_parser import seek_interaction  # noqa: E402
+
+
+def _append(log_file, text):
+    return append_interaction(log_file, lambda: "# Log\n\n---\n",
+                              lambda n: f"\n## Interaction {n}\n**Timestamp:** t\n{text}\n\n---\n")
+
+
+def test_index_holds_count_and_last_offset_only(tmp_path):
+    log_file = tmp_path / "step1.md"
+    for number in range(1, 51):
+        assert _append(log_file, f"question {number}") == number
+
+    with open(index_path(log_file), 'r') as f:
+        index = json.load(f)
+    assert set(index) == {"version", "count", "last_offset"}
+    assert index["count"] == 50
+
+    data = log_file.read_bytes()
+    for number in (1, 17, 50):
+        offset = seek_interaction(log_file, number)
+        assert data[offset:].startswith(f"## Interaction {number}\n".encode())
+
+
+def test_index_rebuilt_after_external_edit(tmp_path):
+    log_file = tmp_path / "step1.md"
+    for number in range(1, 4):
+        _append(log_file, f"question {number}")
+    # Editing an earlier interaction shifts the last heading
+    log_file.write_text(log_file.read_text().replace("question 1", "question one, edited by hand"))
+
+    assert load_index(log_file)["count"] == 3
+    assert _append(log_file, "question 4") == 4
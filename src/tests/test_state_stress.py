@@ -0,0 +1,17 @@
+"""
+Concurrency check for the atomic, versioned state writes
+Runs `python state_stress.py` with fewer processes and rounds than its defaults
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+FRAMEWORK_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_no_state_lost_under_concurrent_writes():
+    result = subprocess.run([sys.executable, "state_stress.py", "--processes", "4", "--rounds", "8"],
+                            cwd=FRAMEWORK_ROOT, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "✅ No state lost under concurrent writes" in result.stdout
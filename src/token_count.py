@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Token Count - Offline token estimates for composed prompts
+Approximates a BPE tokenizer without any external call: text is split into
+word, number, punctuation, whitespace and non-ASCII pieces, each costed by
+how such pieces usually tokenize (code punctuation and emoji cost far more
+than 4 characters per token would suggest). Counts of component bodies are
+cached by content hash in .cache/token_counts.json, so a prompt's token
+cost is the sum of cached component counts plus the question
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+CACHE_FILE = "token_counts.json"
+CACHE_VERSION = 1
+MAX_CACHE_ENTRIES = 512
+WINDOW_ENV = "SIXSTEP_CONTEXT_WINDOW"
+DEFAULT_CONTEXT_WINDOW = 200000
+
+# Letters (with a leading space, as BPE merges them), digits, single newlines,
+# other whitespace runs, ASCII punctuation runs and any other character
+PIECE_PATTERN = re.compile(r" ?[A-Za-z]+| ?[0-9]+|\n|[ \t\r\f\v]+|[!-/:-@\[-`{-~]+|[^\x00-\x7f]")
+
+COMPONENTS = ("framework_info", "step_info", "data_sources", "output_requirements")
+
+
+def context_window():
+    """Context window size in tokens (SIXSTEP_CONTEXT_WINDOW overrides the default)"""
+    try:
+        return int(os.environ.get(WINDOW_ENV, DEFAULT_CONTEXT_WINDOW))
+    except ValueError:
+        return DEFAULT_CONTEXT_WINDOW
+
+
+def _piece_tokens(piece):
+    tail = piece[-1]
+    if tail.isalpha() and tail.isascii():
+        # Common words are one token; long identifiers split every ~5 letters
+        letters = len(piece.lstrip(" "))
+        return 1 if letters <= 6 else -(-letters // 5)
+    if tail.isdigit():
+        return -(-len(piece.lstrip(" ")) // 3)
+    if piece == "\n":
+        return 1
+    if piece.isspace():
+        return -(-len(piece) // 4)
+    if piece.isascii():
+        # Markdown/code punctuation: short runs such as "**" or "```" merge, long runs split
+        return -(-len(piece) // 2)
+    # Non-ASCII (emoji, symbols, CJK): roughly one token per two UTF-8 bytes
+    return -(-len(piece.encode('utf-8')) // 2)
+
+
+def count_tokens(text):
+    """Approximate token count of a text"""
+    return sum(_piece_tokens(piece) for piece in PIECE_PATTERN.findall(text))
+
+
+class TokenCounter:
+    """Token counts cached by content hash (persisted under the framework cache dir)"""
+
+    def __init__(self, cache_dir):
+        self.path = Path(cache_dir) / CACHE_FILE
+        self.counts = None
+        self.dirty = False
+
+    def _load(self):
+        if self.counts is not None:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.counts = data["counts"] if data.get("version") == CACHE_VERSION else {}
+        except (OSError, ValueError, KeyError):
+            self.counts = {}
+
+    def count(self, text):
+        """Token count of a text, computed once per distinct content"""
+        self._load()
+        key = hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+        if key not in self.counts:
+            self.counts[key] = count_tokens(text)
+            self.dirty = True
+        return self.counts[key]
+
+    def save(self):
+        """Atomically persist new counts, keeping the newest MAX_CACHE_ENTRIES"""
+        if not self.dirty:
+            return
+        counts = dict(list(self.counts.items())[-MAX_CACHE_ENTRIES:])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": CACHE_VERSION, "counts": counts}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def prompt_token_report(counter, components, user_question, template_overhead):
+    """
+    {"components": {name: tokens}, "total", "window", "percent"} for a prompt
+    built from components - template_overhead is the prompt text around them
+    """
+    counts = {name: counter.count(components.get(name) or "") for name in COMPONENTS}
+    counts["question"] = count_tokens(user_question)
+    counts["template"] = counter.count(template_overhead)
+    counter.save()
+    total = sum(counts.values())
+    window = context_window()
+    return {"components": counts, "total": total, "window": window, "percent": min(total / window * 100, 100)}
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("count", "prompt"):
+        print("Usage: python token_count.py count FILE [FILE...]")
+        print("       python token_count.py prompt 'user question'")
+        print(f"Context window: {context_window():,} tokens ({WINDOW_ENV} to change)")
+        return
+
+    if sys.argv[1] == "count":
+        for name in sys.argv[2:]:
+            text = Path(name).read_text()
+            tokens = count_tokens(text)
+            print(f"🔢 {name}: {tokens:,} tokens ({len(text):,} chars, {len(text) / max(tokens, 1):.2f} chars/token)")
+        return
+
+    from session_context import SessionContext
+    from framework_state import FrameworkState
+
+    session = SessionContext(FrameworkState(fast_path=True))
+    report = session.prompt_tokens(" ".join(sys.argv[2:]))
+    if report is None:
+        print("❌ No active six-step session found")
+        return
+    for name, tokens in report["components"].items():
+        print(f"   {name:<20} {tokens:>8,} tokens")
+    print(f"🔢 Total: {report['total']:,} / {report['window']:,} tokens ({report['percent']:.1f}% of the window)")
+
+
+if __name__ == "__main__":
+    main()
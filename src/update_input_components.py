@@ -4,18 +4,27 @@ Update input components with intelligent constraint handling
 Actually modifies input component files with new USER PREFERENCES
 """
 
+import hook_profiler  # First import - profiled runs time the imports below
 import sys
-import re
 import argparse
 from pathlib import Path
 from framework_state import FrameworkState
+from session_context import SessionContext
+from component_bundles import recompile_for_file
+from meta_log import locked
+from preference_index import PreferenceIndex
+from preference_consolidation import (bullet_size, select_preferences, record_added, record_confirmation,
+                                      archive_preferences)
+from preference_store import (SECTION_HEADER, store_path, load_store, save_store, ensure_migrated,
+                              step_preferences, set_step_preferences)
 
 
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Update input components with new user preferences')
-    parser.add_argument('prompts', help='New prompts separated by | (e.g., "prompt1 | prompt2 | prompt3")')
+    parser.add_argument('prompts', nargs='?', default='', help='New prompts separated by | (e.g., "prompt1 | prompt2 | prompt3")')
     parser.add_argument('--step', type=str, help='Target step number (e.g., "4"). If not provided, uses current step')
+    parser.add_argument('--batch', type=str, help='File with one prompt per line to import ("-" reads stdin)')
     return parser.parse_args()
 
 
@@ -25,6 +34,13 @@ def split_prompts(prompts_string):
     return [p for p in prompts if p]  # Remove empty prompts
 
 
+def read_batch_prompts(batch_file):
+    """One prompt per line from a file (or stdin for "-"), skipping blanks and # comments"""
+    lines = sys.stdin.read().splitlines() if batch_file == "-" else Path(batch_file).read_text().splitlines()
+    prompts = [line.strip() for line in lines]
+    return [p[2:] if p.startswith("- ") else p for p in prompts if p and not p.startswith("#")]
+
+
 def calculate_section_size(preferences_list):
     """Calculate total character count of USER PREFERENCES section"""
     if not preferences_list:
@@ -55,88 +71,66 @@ def check_duplication(new_prompt, existing_prompts, threshold=0.7):
     return False, None
 
 
-def consolidate_preferences(existing_prefs, new_prefs, max_size=2000):
-    """Intelligently consolidate preferences to fit size constraints"""
+def consolidate_preferences(existing_prefs, new_prefs, max_size=2000, index=None, source=None, metadata=None):
+    """
+    Intelligently consolidate preferences to fit size constraints - returns (kept, evicted)
+    With a PreferenceIndex, duplicates are found across every step_info file
+    """
+    if metadata is None:
+        metadata = {}
     all_prefs = existing_prefs.copy()
+    # Track bullet sizes incrementally instead of re-rendering the section per candidate
+    bullets_size = sum(bullet_size(pref) for pref in all_prefs)
 
     # Add new preferences that aren't duplicates
     for new_pref in new_prefs:
-        is_duplicate, similar_existing = check_duplication(new_pref, all_prefs)
+        duplicate_source = source
+        if index is not None:
+            duplicate = index.find_duplicate(new_pref)
+            is_duplicate, similar_existing = duplicate is not None, duplicate and duplicate[1]
+            if is_duplicate:
+                duplicate_source = duplicate[0]
+        else:
+            is_duplicate, similar_existing = check_duplication(new_pref, all_prefs)
+
         if not is_duplicate:
             all_prefs.append(new_pref)
+            bullets_size += bullet_size(new_pref)
+            record_added(metadata, source, new_pref)
+            if index is not None:
+                index.add(source, new_pref)
         else:
-            print(f"⚠️  DUPLICATE DETECTED: Skipping '{new_pref}' (similar to '{similar_existing}')")
+            # Extraction proposing a preference again confirms the existing one
+            record_confirmation(metadata, duplicate_source, similar_existing)
+            location = f" in {duplicate_source}" if duplicate_source != source else ""
+            print(f"⚠️  DUPLICATE DETECTED: Skipping '{new_pref}' (similar to '{similar_existing}'{location})")
 
     # Check size constraints
-    current_size = calculate_section_size(all_prefs)
+    current_size = len(SECTION_HEADER) + max(0, bullets_size - 1)
     if current_size <= max_size:
-        return all_prefs
-
-    print(f"⚠️  Size constraint exceeded ({current_size} > {max_size}). Consolidating...")
-
-    # Strategy: Prioritize new prompts, then consolidate existing ones
-    # Keep new prompts (they're most important)
-    consolidated = []
-
-    # Add non-duplicate new prompts first
-    for new_pref in new_prefs:
-        is_duplicate, _ = check_duplication(new_pref, existing_prefs)
-        if not is_duplicate:
-            consolidated.append(new_pref)
-
-    # Add existing prompts until we hit size limit, prioritizing shorter ones
-    existing_sorted = sorted(existing_prefs, key=len)
-    for existing_pref in existing_sorted:
-        test_prefs = consolidated + [existing_pref]
-        if calculate_section_size(test_prefs) <= max_size:
-            consolidated.append(existing_pref)
+        return all_prefs, []
 
-    return consolidated
+    print(f"⚠️  Size constraint exceeded ({current_size} > {max_size}). Consolidating by value...")
 
-
-def update_step_info_file(target_file, new_preferences):
-    """Update step_info.md file with new USER PREFERENCES section"""
-    if not target_file.exists():
-        print(f"❌ Target file not found: {target_file}")
-        return False
-
-    content = target_file.read_text()
-
-    # Generate new USER PREFERENCES section
-    if new_preferences:
-        new_section = "## USER PREFERENCES (Auto-Generated)\n\n"
-        new_section += "\n".join(f"- {pref}" for pref in new_preferences)
-    else:
-        new_section = "## USER PREFERENCES (Auto-Generated)\n\n- No preferences configured"
-
-    # Check if USER PREFERENCES section already exists
-    preferences_pattern = r'## USER PREFERENCES \(Auto-Generated\)\n\n.*?(?=\n\n##|\n\n[A-Z]|\Z)'
-
-    if re.search(preferences_pattern, content, re.DOTALL):
-        # Replace existing section
-        updated_content = re.sub(preferences_pattern, new_section, content, flags=re.DOTALL)
-    else:
-        # Add new section at the end
-        updated_content = content.rstrip() + "\n\n" + new_section + "\n"
-
-    # Write back to file
-    target_file.write_text(updated_content)
-    return True
+    # Keep the highest-value set (pinning, confirmations, recency) that fits
+    return select_preferences(source, all_prefs, metadata, max_size)
 
 
 def main():
     """Main entry point - actually update input component files"""
+    hook_profiler.start("update_input_components")
     try:
         args = parse_arguments()
     except SystemExit:
-        print("Usage: python update_input_components.py 'prompt1 | prompt2 | prompt3' [--step N]")
+        print("Usage: python update_input_components.py 'prompt1 | prompt2 | prompt3' [--step N] [--batch FILE] [--profile]")
         print("Example: python update_input_components.py 'Ask clarifying questions first | Present work in phases' --step 4")
         return
 
     try:
-        # Initialize framework state
-        state_manager = FrameworkState()
-        current_state = state_manager.load_current_state()
+        # Initialize framework state (loaded once for this invocation)
+        session = SessionContext(FrameworkState(fast_path=True))
+        state_manager = session.state_manager
+        current_state = session.state
 
         if not current_state:
             print("❌ No active six-step session found. Please start a session with /start-sixstep first.")
@@ -181,7 +175,11 @@ def main():
 
         # Parse new prompts
         new_prompts = split_prompts(args.prompts)
-        print(f"📝 New prompts ({len(new_prompts)}): {new_prompts}")
+        if args.batch:
+            new_prompts += read_batch_prompts(args.batch)
+            print(f"📦 Batch import: {len(new_prompts)} prompts")
+        else:
+            print(f"📝 New prompts ({len(new_prompts)}): {new_prompts}")
 
         if not new_prompts:
             print("❌ No valid prompts provided")
@@ -192,35 +190,49 @@ def main():
             if len(prompt) > 200:
                 print(f"⚠️  Warning: Prompt exceeds 200 characters: '{prompt[:50]}...'")
 
-        # Read existing USER PREFERENCES if they exist
-        existing_preferences = []
-        if target_file.exists():
-            content = target_file.read_text()
-            preferences_match = re.search(r'## USER PREFERENCES \(Auto-Generated\)\n\n(.*?)(?=\n\n##|\n\n[A-Z]|\Z)', content, re.DOTALL)
-            if preferences_match:
-                existing_text = preferences_match.group(1).strip()
-                # Extract bullet points
-                for line in existing_text.split('\n'):
-                    line = line.strip()
-                    if line.startswith('- '):
-                        existing_preferences.append(line[2:])  # Remove "- " prefix
-
-        print(f"📋 Existing preferences ({len(existing_preferences)}): {existing_preferences}")
-
-        # Consolidate preferences with size constraints
-        final_preferences = consolidate_preferences(existing_preferences, new_prompts)
-
-        final_size = calculate_section_size(final_preferences)
-        print(f"📏 Final section size: {final_size} characters (limit: 2000)")
-        print(f"✅ Final preferences ({len(final_preferences)}): {final_preferences}")
-
-        # Update the file
-        if update_step_info_file(target_file, final_preferences):
-            print(f"✅ Successfully updated {target_file}")
-            print(f"   Added {len(new_prompts)} new prompts")
-            print(f"   Total preferences: {len(final_preferences)}")
-        else:
-            print("❌ Failed to update file")
+        if not target_file.exists():
+            print(f"❌ Target file not found: {target_file}")
+            return
+
+        # Hold the store lock from read to save - concurrent updates must not drop each other's preferences
+        with locked(store_path(state_manager.components_dir)):
+            # Read existing USER PREFERENCES from the structured store (migrated from the markdown on first use)
+            store = load_store(state_manager.components_dir)
+            ensure_migrated(state_manager.components_dir, store)
+            existing_preferences = step_preferences(store, target_file_path) or []
+
+            print(f"📋 Existing preferences ({len(existing_preferences)}): {existing_preferences}")
+
+            # Consolidate preferences with size constraints, checking duplicates across all steps
+            with hook_profiler.stage("consolidation"):
+                preference_index = PreferenceIndex.load(state_manager, store)
+                final_preferences, evicted_preferences = consolidate_preferences(
+                    existing_preferences, new_prompts, index=preference_index, source=target_file_path, metadata=store["steps"])
+
+            final_size = calculate_section_size(final_preferences)
+            print(f"📏 Final section size: {final_size} characters (limit: 2000)")
+            print(f"✅ Final preferences ({len(final_preferences)}): {final_preferences}")
+
+            # Update the store - the hand-written step_info markdown is never rewritten
+            # Evicted preferences stay recoverable via preference_consolidation.py restore
+            with hook_profiler.stage("store_write"):
+                archive_preferences(state_manager, target_file_path, evicted_preferences, store["steps"])
+                set_step_preferences(store, target_file_path, final_preferences)
+                save_store(state_manager.components_dir, store)
+
+        # Rebuild compiled bundles, which render the stored preferences into step_info
+        with hook_profiler.stage("bundle_recompile"):
+            recompile_for_file(state_manager, store_path(state_manager.components_dir))
+            preference_index.refresh(store)
+            preference_index.save()
+        state_manager.record_event(current_state, "preferences", source=target_file_path,
+                                   added=len(set(final_preferences) - set(existing_preferences)),
+                                   evicted=len(evicted_preferences))
+        for preference in evicted_preferences:
+            print(f"📦 Archived (lowest value): {preference}")
+        print(f"✅ Successfully updated preferences for {target_file}")
+        print(f"   Added {len(new_prompts)} new prompts")
+        print(f"   Total preferences: {len(final_preferences)}")
 
     except Exception as e:
         print(f"❌ Error updating input components: {e}")